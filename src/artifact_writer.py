@@ -0,0 +1,58 @@
+import queue
+import threading
+import cv2
+from result_cache import atomic_write
+
+
+class ArtifactWriter:
+    def __init__(self, max_pending=4, threads=1):
+        """Fark görüntülerini arka planda diske yazan sınırlı kuyruğu başlatır
+
+        Kuyruk doluysa submit bekler; böylece kodlanmayı bekleyen görüntülerin
+        bellekte kapladığı alan max_pending ile sınırlı kalır.
+        """
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.failed_paths = []
+        self._threads = []
+        for _ in range(max(1, threads)):
+            thread = threading.Thread(target=self._run, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, path, image, params=None):
+        """Görüntüyü yazılmak üzere kuyruğa ekler"""
+        self.queue.put((path, image, params or []))
+    
+    def submit_bytes(self, path, data):
+        """Önceden kodlanmış dosya içeriğini (ör. PNG baytları) olduğu gibi yazılmak üzere kuyruğa ekler"""
+        self.queue.put((path, data, None))
+
+    def flush(self):
+        """Kuyruktaki tüm görüntüler yazılana kadar bekler"""
+        self.queue.join()
+
+    def close(self):
+        """Kuyruğu boşaltır ve yazıcı thread'lerini durdurur"""
+        self.flush()
+        for _ in self._threads:
+            self.queue.put(None)
+        for thread in self._threads:
+            thread.join()
+
+    def _run(self):
+        while True:
+            job = self.queue.get()
+            try:
+                if job is None:
+                    return
+                path, image, params = job
+                if params is None:
+                    # Ham baytlar: yarım dosya görünmesin diye geçici dosya üzerinden
+                    atomic_write(path, image)
+                elif not cv2.imwrite(path, image, params):
+                    raise IOError("cv2.imwrite başarısız oldu")
+            except Exception as e:
+                print(f"❌ Görüntü yazılamadı: {job[0]} ({e})")
+                self.failed_paths.append(job[0])
+            finally:
+                self.queue.task_done()
@@ -0,0 +1,97 @@
+import os
+import json
+import cv2
+import numpy as np
+from result_cache import file_digest, atomic_write
+
+
+class BaselineStore:
+    def __init__(self):
+        """Referans görüntülerin çözülmüş düzlemlerini PNG'nin yanında saklayan depoyu başlatır
+
+        Her referans için renkli ve gri düzlemler ham .npy dosyaları olarak
+        yazılır ve sonraki çalışmalarda np.load(mmap_mode='r') ile açılır; PNG
+        yeniden çözülmez. PNG'nin boyutu/mtime'ı değişirse içerik özeti
+        karşılaştırılır, içerik de değiştiyse düzlemler yeniden üretilir.
+        """
+        self.hits = 0
+        self.misses = 0
+
+    def load(self, image_path):
+        """(renkli, gri) düzlem çiftini döner; görüntü okunamazsa (None, None)"""
+        color_path, gray_path, meta_path = self._paths(image_path)
+
+        try:
+            stat = os.stat(image_path)
+        except OSError:
+            return None, None
+
+        if self._is_valid(image_path, stat, meta_path):
+            try:
+                color = np.load(color_path, mmap_mode='r')
+                gray = np.load(gray_path, mmap_mode='r')
+                self.hits += 1
+                return color, gray
+            except (OSError, ValueError):
+                pass
+
+        self.misses += 1
+        return self._rebuild(image_path, stat, color_path, gray_path, meta_path)
+
+    def _paths(self, image_path):
+        stem = os.path.splitext(image_path)[0]
+        return f"{stem}.color.npy", f"{stem}.gray.npy", f"{stem}.planes.json"
+
+    def _read_meta(self, meta_path):
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self, meta_path, meta):
+        atomic_write(meta_path, json.dumps(meta))
+
+    def _is_valid(self, image_path, stat, meta_path):
+        """Kayıtlı düzlemlerin PNG ile hâlâ eşleşip eşleşmediğini kontrol eder"""
+        meta = self._read_meta(meta_path)
+        if not meta or meta.get('size') != stat.st_size:
+            return False
+
+        if meta.get('mtime_ns') == stat.st_mtime_ns:
+            return True
+
+        # mtime değişti: içerik aynıysa düzlemler geçerli, sadece kaydı güncelle
+        if meta.get('digest') != file_digest(image_path):
+            return False
+
+        meta['mtime_ns'] = stat.st_mtime_ns
+        try:
+            self._write_meta(meta_path, meta)
+        except OSError:
+            pass
+        return True
+
+    def _rebuild(self, image_path, stat, color_path, gray_path, meta_path):
+        """PNG'yi çözer, düzlemleri diske yazar ve bellekteki kopyaları döner"""
+        color = cv2.imread(image_path)
+        if color is None:
+            return None, None
+        gray = cv2.cvtColor(color, cv2.COLOR_BGR2GRAY)
+
+        try:
+            # Önce düzlemler, en son meta yazılır; yarım kalan yazım geçersiz sayılır
+            if os.path.exists(meta_path):
+                os.remove(meta_path)
+            for path, plane in ((color_path, color), (gray_path, gray)):
+                atomic_write(path, lambda f, plane=plane: np.save(f, plane))
+            self._write_meta(meta_path, {
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+                'digest': file_digest(image_path),
+                'shape': list(color.shape)
+            })
+        except OSError as e:
+            print(f"⚠️ Referans düzlemleri kaydedilemedi: {image_path} ({e})")
+
+        return color, gray
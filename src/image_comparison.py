@@ -3,10 +3,134 @@ import numpy as np
 import os
 from PIL import Image, ImageDraw
 import json
+import tempfile
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
+from result_cache import ResultCache, file_digest, bytes_digest
+from artifact_writer import ArtifactWriter
+from baseline_store import BaselineStore
+
+
+class RegionAccumulator:
+    """Fark maskesindeki bağlı bileşenleri (fark bölgelerini) biriktirir
+
+    Maske şerit şerit verilebilir; bir şeridin ilk satırı ile önceki şeridin son
+    satırında 8-komşu olan bileşenler tek bölge olarak birleştirilir.
+    """
+
+    def __init__(self):
+        self.parent = []
+        self.stats = []
+        self._last_row = None
+
+    def add(self, mask, y_offset=0):
+        """Maske parçasının bileşenlerini ekler (y_offset: parçanın sayfadaki ilk satırı)"""
+        count, labels, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+        base = len(self.parent)
+        
+        # Etiketleri global numaralara çevir (-1 = arka plan)
+        first_row = np.where(labels[0] > 0, labels[0] - 1 + base, -1)
+        last_row = np.where(labels[-1] > 0, labels[-1] - 1 + base, -1)
+        
+        if count > 1:
+            component_stats = stats[1:].astype(np.int64)
+            component_stats[:, cv2.CC_STAT_TOP] += y_offset
+            self.stats.append(component_stats)
+            self.parent.extend(range(base, base + count - 1))
+        
+        # Şerit sınırında komşu olan bileşenleri birleştir
+        if self._last_row is not None:
+            previous = self._last_row
+            for current, above in ((first_row, previous), (first_row[1:], previous[:-1]), (first_row[:-1], previous[1:])):
+                valid = (current >= 0) & (above >= 0)
+                if np.any(valid):
+                    for a, b in set(zip(current[valid].tolist(), above[valid].tolist())):
+                        self._union(a, b)
+        
+        self._last_row = last_row
+
+    def _find(self, index):
+        while self.parent[index] != index:
+            self.parent[index] = self.parent[self.parent[index]]
+            index = self.parent[index]
+        return index
+
+    def _union(self, a, b):
+        root_a, root_b = self._find(a), self._find(b)
+        if root_a != root_b:
+            self.parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    def regions(self):
+        """Bölgeleri alana göre büyükten küçüğe sıralı liste olarak döner"""
+        if not self.stats:
+            return []
+        
+        stats = np.concatenate(self.stats)
+        roots = np.array([self._find(i) for i in range(len(self.parent))])
+        
+        x0 = stats[:, cv2.CC_STAT_LEFT]
+        y0 = stats[:, cv2.CC_STAT_TOP]
+        x1 = x0 + stats[:, cv2.CC_STAT_WIDTH]
+        y1 = y0 + stats[:, cv2.CC_STAT_HEIGHT]
+        
+        size = len(roots)
+        min_x = np.full(size, np.iinfo(np.int64).max)
+        min_y = np.full(size, np.iinfo(np.int64).max)
+        max_x = np.zeros(size, np.int64)
+        max_y = np.zeros(size, np.int64)
+        area = np.zeros(size, np.int64)
+        np.minimum.at(min_x, roots, x0)
+        np.minimum.at(min_y, roots, y0)
+        np.maximum.at(max_x, roots, x1)
+        np.maximum.at(max_y, roots, y1)
+        np.add.at(area, roots, stats[:, cv2.CC_STAT_AREA])
+        
+        regions = [
+            {
+                'x': int(min_x[root]),
+                'y': int(min_y[root]),
+                'width': int(max_x[root] - min_x[root]),
+                'height': int(max_y[root] - min_y[root]),
+                'area': int(area[root])
+            }
+            for root in np.unique(roots)
+        ]
+        regions.sort(key=lambda region: region['area'], reverse=True)
+        return regions
+
+
+# Süreç havuzu işçisindeki karşılaştırma örneği; _init_worker ile işçi başına bir kez kurulur
+_worker_comparison = None
+
+
+def _init_worker(comparison):
+    """İşçi süreç başlarken karşılaştırma örneğini bir kez alır"""
+    global _worker_comparison
+    _worker_comparison = comparison
+
+
+def _compare_page_job(baseline_path, test_path, page_name, plan_entry, test_data=None, digests=None):
+    """İşçi süreçte tek sayfayı, işle birlikte gelen plan kaydıyla karşılaştırır
+
+    İşe sadece bu sayfanın plan kaydı eklenir; iş bitince plan kaydı ve
+    bellekteki görüntü atılır, işçinin belleği sayfa sayısıyla büyümez.
+    """
+    _worker_comparison._plan[page_name] = plan_entry
+    try:
+        return _worker_comparison._compare_page_safe(baseline_path, test_path, page_name, test_data, digests)
+    finally:
+        _worker_comparison._plan.pop(page_name, None)
+        _worker_comparison._test_images.pop(os.path.normpath(test_path), None)
 
 
 class ImageComparison:
+    # SSIM için Gauss penceresi (Wang vd. 2004 ile aynı)
+    SSIM_WINDOW = 11
+    SSIM_SIGMA = 1.5
+
     def __init__(self, config_file="config/test_config.json"):
         """ImageComparison sınıfını başlatır"""
         self.config = self._load_config(config_file)
@@ -16,6 +140,58 @@ class ImageComparison:
         self.min_difference_pixels = self.config.get('comparison_settings', {}).get('min_difference_pixels', 100)
         self.highlight_differences = self.config.get('comparison_settings', {}).get('highlight_differences', True)
         self.save_differences = self.config.get('comparison_settings', {}).get('save_differences', True)
+        self.morphology_kernel = self.config.get('comparison_settings', {}).get('morphology_kernel', 3)
+        self.scoring = self.config.get('comparison_settings', {}).get('scoring', 'pixel')  # pixel, ssim
+        self.workers = self.config.get('comparison_settings', {}).get('workers', 1)
+        self.identical_fast_path = self.config.get('comparison_settings', {}).get('identical_fast_path', True)
+        self.write_identical_diffs = self.config.get('comparison_settings', {}).get('write_identical_diffs', False)
+        
+        # Çok uzun tam sayfa görüntüler için şerit şerit karşılaştırma
+        tiling_settings = self.config.get('comparison_settings', {}).get('tiling', {})
+        self.tiling_mode = tiling_settings.get('mode', 'auto')  # auto, always, never
+        self.tile_height = tiling_settings.get('tile_height', 1024)
+        self.tile_auto_min_height = tiling_settings.get('auto_min_height', 4096)
+        
+        # Kaba-ince (piramit) karşılaştırma: net sonuçlarda tam çözünürlüğe inme
+        pyramid_settings = self.config.get('comparison_settings', {}).get('pyramid', {})
+        self.pyramid_enabled = pyramid_settings.get('enabled', False)
+        self.pyramid_levels = pyramid_settings.get('levels', 2)
+        self.pyramid_margin = pyramid_settings.get('margin', 0.05)
+        
+        # Fark bölgeleri (bağlı bileşenler) ve fark görüntüsü türü
+        self.diff_artifact = self.config.get('comparison_settings', {}).get('diff_artifact', 'composite')  # composite, regions
+        region_settings = self.config.get('comparison_settings', {}).get('regions', {})
+        self.max_regions = region_settings.get('max_regions', 50)
+        self.max_region_images = region_settings.get('max_region_images', 10)
+        self.region_padding = region_settings.get('padding', 16)
+        
+        # Fark görüntüsü kodlama ayarları ve arka plan yazıcısı
+        self.diff_format = self.config.get('comparison_settings', {}).get('diff_format', 'png')  # png, webp (kayıpsız)
+        self.png_compression = self.config.get('comparison_settings', {}).get('png_compression', 1)
+        writer_settings = self.config.get('comparison_settings', {}).get('async_writer', {})
+        self.async_writer_enabled = writer_settings.get('enabled', True)
+        self.async_writer_max_pending = writer_settings.get('max_pending', 4)
+        self.async_writer_threads = writer_settings.get('threads', 1)
+        self._artifact_writer = None
+        
+        # Sayfa adı -> çözülmüş ayarlar/yollar/kernel (compile_plan ile oluşturulur)
+        self._plan = None
+        
+        # Bellekteki test ekran görüntüleri (yol -> PNG baytları, set_test_images ile)
+        self._test_images = {}
+        
+        # Referansların çözülmüş düzlemlerini .npy olarak saklayan depo
+        store_settings = self.config.get('comparison_settings', {}).get('baseline_store', {})
+        self.baseline_store = BaselineStore() if store_settings.get('enabled', False) else None
+        
+        # Değişmeyen referans/test çiftleri için sonuç önbelleği
+        cache_settings = self.config.get('comparison_settings', {}).get('cache', {})
+        self.result_cache = None
+        if cache_settings.get('enabled', False):
+            self.result_cache = ResultCache(
+                cache_settings.get('directory', '.cache/comparison'),
+                cache_settings.get('max_size_mb', 256)
+            )
     
     def _load_config(self, config_file):
         """Konfigürasyon dosyasını yükler"""
@@ -28,35 +204,107 @@ class ImageComparison:
     
     def load_image(self, image_path):
         """Görüntüyü yükler ve ön işleme yapar"""
+        _, gray = self.decode_image(image_path)
+        return gray
+    
+    def decode_image(self, image_path, grayscale=True):
+        """Görüntüyü tek seferde çözer, (renkli, gri) çiftini döner
+
+        grayscale=False ise gri kare üretilmez (şeritli karşılaştırma kendi
+        şeritlerini dönüştürür).
+        """
         try:
-            if not os.path.exists(image_path):
+            data = self._memory_image(image_path)
+            if data is not None:
+                # Bellekteki ekran görüntüsü: dosya okumadan doğrudan çöz
+                image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+            elif not os.path.exists(image_path):
                 print(f"❌ Görüntü dosyası bulunamadı: {image_path}")
-                return None
-            
-            # Görüntüyü OpenCV ile yükle
-            image = cv2.imread(image_path)
+                return None, None
+            else:
+                # Görüntüyü OpenCV ile yükle
+                image = cv2.imread(image_path)
             if image is None:
                 print(f"❌ Görüntü yüklenemedi: {image_path}")
-                return None
+                return None, None
+            
+            if not grayscale:
+                return image, None
             
             # Görüntüyü gri tonlamaya çevir (daha iyi karşılaştırma için)
             gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
             
-            return gray
+            return image, gray
             
         except Exception as e:
             print(f"❌ Görüntü yükleme hatası: {e}")
+            return None, None
+    
+    def set_test_images(self, images):
+        """Bellekte tutulan test ekran görüntülerini (yol -> PNG baytları) kaydeder
+
+        Kayıtlı yollar için dosya okunmaz; karşılaştırma, hızlı yol ve önbellek
+        anahtarı doğrudan bu baytları kullanır. Dosyanın diske yazılması
+        (varsa) çekim tarafında arka planda yapılır.
+        """
+        self._test_images = {}
+        for path, data in (images or {}).items():
+            self.add_test_image(path, data)
+    
+    def add_test_image(self, image_path, data):
+        """Tek bir test ekran görüntüsünü bellekteki görüntülere ekler"""
+        self._test_images[os.path.normpath(image_path)] = data
+    
+    def _memory_image(self, image_path):
+        """Yol bellekte kayıtlıysa PNG baytlarını, değilse None döner"""
+        if not self._test_images:
             return None
+        return self._test_images.get(os.path.normpath(image_path))
+    
+    def _decode_baseline(self, baseline_path, grayscale=True):
+        """Referansı varsa memmap'li düzlem deposundan, yoksa PNG'den yükler"""
+        if self.baseline_store is None:
+            return self.decode_image(baseline_path, grayscale)
+        
+        color, gray = self.baseline_store.load(baseline_path)
+        if color is None:
+            print(f"❌ Görüntü yüklenemedi: {baseline_path}")
+            return None, None
+        return color, (gray if grayscale else None)
     
-    def compare_images(self, baseline_path, test_path, page_name):
-        """İki görüntüyü karşılaştırır ve farkları tespit eder"""
+    def compare_images(self, baseline_path, test_path, page_name, digests=None):
+        """İki görüntüyü karşılaştırır ve farkları tespit eder
+
+        digests: önceden hesaplanmış (referans, test) içerik özetleri; verilirse
+        birebir aynı dosya kontrolü dosyaları yeniden özetlemez.
+        """
         print(f"🔍 {page_name} sayfası karşılaştırılıyor...")
         
-        # Görüntüleri yükle
-        baseline_img = self.load_image(baseline_path)
-        test_img = self.load_image(test_path)
+        # Bayt bayt aynı dosyalarda görüntü çözmeye gerek yok
+        if self.identical_fast_path and self._files_identical(baseline_path, test_path, digests):
+            result = self._identical_result(baseline_path, test_path, page_name)
+            if result:
+                return result
         
-        if baseline_img is None or test_img is None:
+        # Sayfa özel ayarlarını uygula
+        plan_entry = self._plan_entry(page_name)
+        settings = plan_entry['settings']
+        tolerance = settings['tolerance']
+        threshold = settings['threshold']
+        fail_threshold = settings['fail_threshold']
+        min_diff_pixels = settings['min_difference_pixels']
+        
+        if settings['special']:
+            print(f"🎯 {page_name} için özel ayarlar kullanılıyor: tolerance={tolerance}, threshold={threshold}")
+        
+        # Uzun sayfalarda tam kare gri görüntü üretmeden şerit şerit ilerle
+        tiled = self._should_tile(baseline_path)
+        
+        # Görüntüleri yükle - renkli ve gri kareler tek çözümlemeden gelir
+        baseline_color, baseline_img = self._decode_baseline(baseline_path, grayscale=not tiled)
+        test_color, test_img = self.decode_image(test_path, grayscale=not tiled)
+        
+        if baseline_color is None or test_color is None:
             return {
                 'success': False,
                 'error': 'Görüntü yüklenemedi',
@@ -64,60 +312,50 @@ class ImageComparison:
             }
         
         # Görüntü boyutlarını kontrol et
-        if baseline_img.shape != test_img.shape:
-            print(f"⚠️ Görüntü boyutları farklı: {baseline_img.shape} vs {test_img.shape}")
+        height, width = baseline_color.shape[:2]
+        if baseline_color.shape != test_color.shape:
+            print(f"⚠️ Görüntü boyutları farklı: {baseline_color.shape[:2]} vs {test_color.shape[:2]}")
             # Test görüntüsünü baseline boyutuna yeniden boyutlandır
-            test_img = cv2.resize(test_img, (baseline_img.shape[1], baseline_img.shape[0]))
-        
-        # Sayfa özel ayarlarını kontrol et
-        page_config = None
-        for page in self.config.get('test_pages', []):
-            if page['name'] == page_name:
-                page_config = page
-                break
-        
-        # Özel ayarları uygula
-        tolerance = page_config.get('special_settings', {}).get('tolerance', self.tolerance)
-        threshold = page_config.get('special_settings', {}).get('threshold', self.threshold)
-        fail_threshold = page_config.get('special_settings', {}).get('fail_threshold', self.fail_threshold)
-        min_diff_pixels = page_config.get('special_settings', {}).get('min_difference_pixels', self.min_difference_pixels)
+            test_color = cv2.resize(test_color, (width, height))
+            if test_img is not None:
+                test_img = cv2.resize(test_img, (width, height))
         
-        if page_config and page_config.get('special_settings'):
-            print(f"🎯 {page_name} için özel ayarlar kullanılıyor: tolerance={tolerance}, threshold={threshold}")
-        
-        # Görüntü farkını hesapla - daha hassas karşılaştırma
-        diff = cv2.absdiff(baseline_img, test_img)
-        
-        # Fark eşiğini uygula - özel tolerance ile
-        _, thresh = cv2.threshold(diff, tolerance, 255, cv2.THRESH_BINARY)
+        # Morfolojik işlemler için kernel (planda bir kez oluşturulur)
+        kernel = plan_entry['kernel']
         
-        # Morfolojik işlemler ile gürültüyü azalt
-        kernel = np.ones((3,3), np.uint8)  # Daha büyük kernel
-        thresh = cv2.morphologyEx(thresh, cv2.MORPH_CLOSE, kernel)
-        thresh = cv2.morphologyEx(thresh, cv2.MORPH_OPEN, kernel)
+        diff_image_path = None
+        decision_level = 0
+        pyramid_decision = None
+        ssim_score = None
+        use_ssim = settings['scoring'] == 'ssim'
+        region_accumulator = RegionAccumulator()
+        if tiled:
+            different_pixels, diff_image_path, tile_count, ssim_score = self._compare_tiled(
+                baseline_color, test_color, tolerance, kernel, page_name, region_accumulator, use_ssim
+            )
+        else:
+            if use_ssim:
+                ssim_score = cv2.mean(self._ssim_map(baseline_img, test_img))[0]
+            elif self.pyramid_enabled:
+                # Piramit kararı piksel skoruna dayanır; SSIM modunda kullanılmaz
+                pyramid_decision = self._compare_pyramid(baseline_img, test_img, settings, kernel)
+            
+            if pyramid_decision:
+                passed, different_pixels, thresh, decision_level = pyramid_decision
+            else:
+                thresh = self._difference_mask(baseline_img, test_img, tolerance, kernel)
+                different_pixels = int(np.count_nonzero(thresh))
+            region_accumulator.add(thresh)
         
         # Fark yüzdesini hesapla
-        total_pixels = baseline_img.shape[0] * baseline_img.shape[1]
-        different_pixels = np.count_nonzero(thresh)
+        total_pixels = height * width
         difference_percentage = (different_pixels / total_pixels) * 100
         
         # Benzerlik skorunu hesapla
         similarity_score = 1 - (difference_percentage / 100)
         
-        # Gelişmiş PASS/FAIL mantığı - özel ayarlarla
-        passed = True
-        if different_pixels < min_diff_pixels:
-            # Çok az fark varsa PASS
-            passed = True
-        elif similarity_score >= threshold:
-            # Yüksek benzerlik varsa PASS
-            passed = True
-        elif similarity_score < fail_threshold:
-            # Düşük benzerlik varsa FAIL
-            passed = False
-        else:
-            # Orta seviye benzerlik - fark yüzdesine göre karar ver
-            passed = difference_percentage < 10.0  # %10'dan az fark PASS
+        if not pyramid_decision:
+            passed = self._decide_passed(different_pixels, similarity_score, difference_percentage, settings, ssim_score)
         
         # Sonuçları hazırla
         result = {
@@ -132,107 +370,746 @@ class ImageComparison:
             'passed': passed,
             'timestamp': datetime.now().isoformat()
         }
+        if use_ssim:
+            result['scoring'] = 'ssim'
+            result['ssim_score'] = ssim_score
+        if tiled:
+            result['tiles'] = tile_count
+        elif self.pyramid_enabled and not use_ssim:
+            # 0 = tam çözünürlük, n = n kez küçültülmüş seviye
+            result['decision_level'] = decision_level
+        
+        # Değişen bölgeler (bağlı bileşenlerin sınır kutuları)
+        regions = region_accumulator.regions()
+        result['diff_region_count'] = len(regions)
+        result['diff_regions'] = regions[:self.max_regions]
         
         # Fark görüntüsü oluştur - her zaman oluştur (fark olsun veya olmasın)
         if self.save_differences:
-            diff_image_path = self._create_difference_image(
-                baseline_path, test_path, thresh, page_name
-            )
-            result['difference_image_path'] = diff_image_path
+            if self.diff_artifact == 'regions':
+                # Tam sayfa yerine sadece değişen bölgelerin kırpılmış görüntüleri
+                result['region_image_paths'] = self._create_region_images(
+                    baseline_color, test_color, regions[:self.max_region_images], tolerance, kernel, page_name
+                )
+            else:
+                if not tiled:
+                    diff_image_path = self._create_difference_image(
+                        baseline_color, test_color, thresh, page_name
+                    )
+                result['difference_image_path'] = diff_image_path
         
         # Sonuçları yazdır
         status = "✅ PASS" if result['passed'] else "❌ FAIL"
-        print(f"{status} {page_name}: Benzerlik: {similarity_score:.2%}, Fark: {difference_percentage:.2f}% ({different_pixels} piksel)")
+        ssim_text = f", SSIM: {ssim_score:.4f}" if use_ssim else ""
+        print(f"{status} {page_name}: Benzerlik: {similarity_score:.2%}, Fark: {difference_percentage:.2f}% ({different_pixels} piksel){ssim_text}")
         
         return result
     
-    def _create_difference_image(self, baseline_path, test_path, diff_mask, page_name):
-        """Fark görüntüsü oluşturur ve kaydeder"""
+    def _files_identical(self, baseline_path, test_path, digests=None):
+        """Dosya boyutu ve içerik özeti ile iki dosyanın aynı olup olmadığını kontrol eder"""
+        if digests is not None:
+            return digests[0] == digests[1]
         try:
-            # Results klasörünü oluştur
-            results_dir = "results"
-            os.makedirs(results_dir, exist_ok=True)
-            
-            # Baseline ve test görüntülerini yükle
-            baseline_color = cv2.imread(baseline_path)
-            test_color = cv2.imread(test_path)
-            
-            # Test görüntüsünü baseline boyutuna yeniden boyutlandır
-            if baseline_color.shape != test_color.shape:
-                test_color = cv2.resize(test_color, (baseline_color.shape[1], baseline_color.shape[0]))
-            
-            # Fark maskesini renkli hale getir
-            diff_color = cv2.cvtColor(diff_mask, cv2.COLOR_GRAY2BGR)
-            
-            # Daha anlaşılır ve göze yumuşak renkler kullan
-            # Açık yeşil: Değişmeyen alanlar (güvenli)
-            # Sarı: Değişen alanlar (dikkat edilmesi gereken)
-            # Sadece değişiklikleri turuncu ile işaretle
-            diff_color[diff_mask > 0] = [0, 165, 255]  # BGR formatında turuncu (değişen alanlar)
-            
-            # Değişmeyen alanları beyaz yap (nötr arka plan)
-            unchanged_mask = (diff_mask == 0)
-            diff_color[unchanged_mask] = [255, 255, 255]  # BGR formatında beyaz (değişmeyen alanlar)
-            
-            # Overlay görüntüsü oluştur (sadece değişiklikleri vurgula)
-            overlay = test_color.copy()
-            overlay[diff_mask > 0] = [0, 165, 255]  # Turuncu overlay (değişen alanlar)
-            
-            # Overlay'i şeffaf yap
-            alpha = 0.4  # Biraz daha görünür şeffaflık
-            overlay_image = cv2.addWeighted(test_color, 1-alpha, overlay, alpha, 0)
-            
-            # Görüntüleri yan yana birleştir
-            # 1. Referans görüntü | 2. Test görüntüsü | 3. Fark haritası | 4. Overlay
-            combined = np.hstack([baseline_color, test_color, diff_color, overlay_image])
+            test_data = self._memory_image(test_path)
+            if test_data is not None:
+                if os.path.getsize(baseline_path) != len(test_data):
+                    return False
+                return file_digest(baseline_path) == bytes_digest(test_data)
+            if os.path.getsize(baseline_path) != os.path.getsize(test_path):
+                return False
+            return file_digest(baseline_path) == file_digest(test_path)
+        except OSError:
+            return False
+    
+    def _identical_result(self, baseline_path, test_path, page_name):
+        """Aynı dosyalar için görüntü işlemeden PASS sonucu üretir"""
+        size = self._image_size(baseline_path)
+        if size is None:
+            print(f"⚠️ {page_name} görüntü başlığı okunamadı, tam karşılaştırma yapılacak")
+            return None
+        width, height = size
+        
+        result = {
+            'success': True,
+            'page_name': page_name,
+            'baseline_path': baseline_path,
+            'test_path': test_path,
+            'similarity_score': 1.0,
+            'difference_percentage': 0.0,
+            'total_pixels': width * height,
+            'different_pixels': 0,
+            'passed': True,
+            'identical_files': True,
+            'diff_region_count': 0,
+            'diff_regions': [],
+            'timestamp': datetime.now().isoformat()
+        }
+        if self._plan_entry(page_name)['settings']['scoring'] == 'ssim':
+            result['scoring'] = 'ssim'
+            result['ssim_score'] = 1.0
+        
+        # İstenirse boş fark maskesiyle fark görüntüsü yine de yazılır
+        if self.save_differences and self.write_identical_diffs and self.diff_artifact == 'regions':
+            result['region_image_paths'] = []
+        elif self.save_differences and self.write_identical_diffs:
+            baseline_color, _ = self.decode_image(baseline_path)
+            if baseline_color is not None:
+                diff_mask = np.zeros(baseline_color.shape[:2], np.uint8)
+                result['difference_image_path'] = self._create_difference_image(
+                    baseline_color, baseline_color, diff_mask, page_name
+                )
+        
+        print(f"✅ PASS {page_name}: Dosyalar birebir aynı, görüntü karşılaştırması atlandı")
+        return result
+    
+    def _decide_passed(self, different_pixels, similarity_score, difference_percentage, settings, ssim_score=None):
+        """Gelişmiş PASS/FAIL mantığı - özel ayarlarla
+
+        ssim_score verilirse eşikler piksel benzerliği yerine SSIM skoruna uygulanır.
+        """
+        if ssim_score is not None:
+            threshold_score = ssim_score
+            threshold = settings['ssim_threshold']
+            fail_threshold = settings['ssim_fail_threshold']
+        else:
+            threshold_score = similarity_score
+            threshold = settings['threshold']
+            fail_threshold = settings['fail_threshold']
+        
+        if different_pixels < settings['min_difference_pixels']:
+            # Çok az fark varsa PASS
+            return True
+        elif threshold_score >= threshold:
+            # Yüksek benzerlik varsa PASS
+            return True
+        elif threshold_score < fail_threshold:
+            # Düşük benzerlik varsa FAIL
+            return False
+        else:
+            # Orta seviye benzerlik - fark yüzdesine göre karar ver
+            return difference_percentage < 10.0  # %10'dan az fark PASS
+    
+    def _compare_pyramid(self, baseline_img, test_img, settings, kernel):
+        """Küçültülmüş karelerde karşılaştırma yapar ve erken karar vermeye çalışır
+
+        Kaba benzerlik threshold'un margin kadar üstündeyse PASS, fail_threshold'un
+        margin kadar altındaysa FAIL kararı verilir ve (passed, tahmini farklı piksel,
+        tam boyuta büyütülmüş maske, seviye) döner. Belirsiz bantta None döner ve
+        tam çözünürlüklü karşılaştırma yapılır.
+        """
+        baseline_small, test_small = baseline_img, test_img
+        level = 0
+        for _ in range(self.pyramid_levels):
+            if min(baseline_small.shape[:2]) < 32:
+                break
+            baseline_small = cv2.pyrDown(baseline_small)
+            test_small = cv2.pyrDown(test_small)
+            level += 1
+        
+        if level == 0:
+            return None
+        
+        mask = self._difference_mask(baseline_small, test_small, settings['tolerance'], kernel)
+        coarse_pixels = int(np.count_nonzero(mask))
+        similarity_score = 1 - coarse_pixels / mask.size
+        
+        # Kaba seviyedeki sayıyı tam çözünürlüğe ölçekle
+        different_pixels = int(round(coarse_pixels * baseline_img.size / mask.size))
+        
+        if similarity_score >= settings['threshold'] + self.pyramid_margin:
+            passed = True
+        elif (similarity_score < settings['fail_threshold'] - self.pyramid_margin
+              and different_pixels >= settings['min_difference_pixels']):
+            passed = False
+        else:
+            return None
+        
+        height, width = baseline_img.shape[:2]
+        full_mask = cv2.resize(mask, (width, height), interpolation=cv2.INTER_NEAREST)
+        return passed, different_pixels, full_mask, level
+    
+    def _image_size(self, image_path):
+        """Görüntü boyutunu (genişlik, yükseklik) sadece dosya başlığından okur"""
+        try:
+            with Image.open(image_path) as image:
+                return image.size
+        except Exception:
+            return None
+    
+    def _should_tile(self, baseline_path):
+        """Şeritli karşılaştırmanın kullanılıp kullanılmayacağına karar verir"""
+        if self.tiling_mode == 'always':
+            return True
+        if self.tiling_mode != 'auto':
+            return False
+        size = self._image_size(baseline_path)
+        return size is not None and size[1] >= self.tile_auto_min_height
+    
+    def _difference_mask(self, baseline_img, test_img, tolerance, kernel):
+        """Gri kareler için eşiklenmiş ve gürültüsü azaltılmış fark maskesi üretir"""
+        # Görüntü farkını hesapla - daha hassas karşılaştırma
+        diff = cv2.absdiff(baseline_img, test_img)
+        
+        # Fark eşiğini uygula - özel tolerance ile
+        _, thresh = cv2.threshold(diff, tolerance, 255, cv2.THRESH_BINARY)
+        
+        # Morfolojik işlemler ile gürültüyü azalt
+        thresh = cv2.morphologyEx(thresh, cv2.MORPH_CLOSE, kernel)
+        thresh = cv2.morphologyEx(thresh, cv2.MORPH_OPEN, kernel)
+        return thresh
+    
+    def _compare_tiled(self, baseline_color, test_color, tolerance, kernel, page_name, region_accumulator, use_ssim=False):
+        """Görüntüleri yatay şeritler halinde karşılaştırır
+
+        Her şerit, morfoloji (ve SSIM filtresi) şerit kenarında tam kare ile aynı
+        sonucu versin diye komşu satırlarla genişletilir; sadece şeridin kendi
+        satırları sayılır. Fark görüntüsü diskteki bir memmap'e şerit şerit
+        yazılır, böylece bellek kullanımı sayfa yüksekliğiyle değil şerit
+        boyutuyla büyür.
+        """
+        height, width = baseline_color.shape[:2]
+        # MORPH_CLOSE + MORPH_OPEN ardışık dört erozyon/dilatasyon demektir
+        overlap = 4 * (kernel.shape[0] // 2)
+        if use_ssim:
+            overlap = max(overlap, self.SSIM_WINDOW // 2)
+        
+        temp_file = None
+        composite = None
+        if self.save_differences and self.diff_artifact != 'regions':
+            temp_file = tempfile.TemporaryFile()
+            composite = np.memmap(temp_file, dtype=np.uint8, mode='w+', shape=(height, width * 4, 3))
+        
+        different_pixels = 0
+        ssim_sum = 0.0
+        tile_count = 0
+        diff_image_path = None
+        try:
+            for y0 in range(0, height, self.tile_height):
+                y1 = min(y0 + self.tile_height, height)
+                top = max(0, y0 - overlap)
+                bottom = min(height, y1 + overlap)
+                
+                baseline_strip = cv2.cvtColor(baseline_color[top:bottom], cv2.COLOR_BGR2GRAY)
+                test_strip = cv2.cvtColor(test_color[top:bottom], cv2.COLOR_BGR2GRAY)
+                mask = self._difference_mask(baseline_strip, test_strip, tolerance, kernel)
+                mask = mask[y0 - top:y1 - top]
+                
+                different_pixels += int(np.count_nonzero(mask))
+                region_accumulator.add(mask, y0)
+                tile_count += 1
+                
+                if use_ssim:
+                    ssim_map = self._ssim_map(baseline_strip, test_strip)
+                    ssim_sum += cv2.sumElems(ssim_map[y0 - top:y1 - top])[0]
+                
+                if composite is not None:
+                    composite[y0:y1] = self._render_difference_panels(
+                        baseline_color[y0:y1], test_color[y0:y1], mask
+                    )
             
-            # Fark görüntüsünü kaydet
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            diff_image_path = os.path.join(results_dir, f"{page_name}_diff_{timestamp}.png")
-            cv2.imwrite(diff_image_path, combined)
+            if composite is not None:
+                try:
+                    # Memmap geçici dosyayla birlikte kapanacağı için senkron yazılır
+                    diff_image_path = self._save_difference_image(composite, different_pixels, page_name, synchronous=True)
+                except Exception as e:
+                    print(f"❌ Fark görüntüsü oluşturma hatası: {e}")
+        finally:
+            del composite
+            if temp_file:
+                temp_file.close()
+        
+        ssim_score = ssim_sum / (height * width) if use_ssim else None
+        print(f"🧩 {page_name}: {tile_count} şerit halinde karşılaştırıldı ({height}px yükseklik)")
+        return different_pixels, diff_image_path, tile_count, ssim_score
+    
+    def _ssim_map(self, baseline_img, test_img):
+        """Yapısal benzerlik (SSIM) haritasını ayrılabilir Gauss filtreleriyle hesaplar
+
+        Tüm işlemler OpenCV üzerinde vektörel ve mümkün olduğunca yerinde yapılır;
+        piksel döngüsü yoktur. Paydada sadece sigma_x^2 + sigma_y^2 toplamı
+        gerektiğinden x^2 + y^2 tek filtreyle süzülür (5 yerine 4 filtre).
+        """
+        c1 = (0.01 * 255) ** 2
+        c2 = (0.03 * 255) ** 2
+        window = (self.SSIM_WINDOW, self.SSIM_WINDOW)
+        
+        baseline = baseline_img.astype(np.float32)
+        test = test_img.astype(np.float32)
+        
+        mu_baseline = cv2.GaussianBlur(baseline, window, self.SSIM_SIGMA)
+        mu_test = cv2.GaussianBlur(test, window, self.SSIM_SIGMA)
+        
+        # E[xy] ve E[x^2 + y^2]
+        cross = cv2.GaussianBlur(cv2.multiply(baseline, test), window, self.SSIM_SIGMA)
+        squares = cv2.multiply(baseline, baseline)
+        cv2.accumulateSquare(test, squares)
+        squares = cv2.GaussianBlur(squares, window, self.SSIM_SIGMA)
+        
+        # mu_x * mu_y ve mu_x^2 + mu_y^2
+        mu_cross = cv2.multiply(mu_baseline, mu_test)
+        mu_squares = cv2.multiply(mu_baseline, mu_baseline)
+        cv2.accumulateSquare(mu_test, mu_squares)
+        
+        # sigma_xy ve sigma_x^2 + sigma_y^2
+        cross -= mu_cross
+        squares -= mu_squares
+        
+        # (2 mu_xy + c1)(2 sigma_xy + c2) / ((mu_x^2 + mu_y^2 + c1)(sigma_x^2 + sigma_y^2 + c2))
+        mu_cross *= 2
+        mu_cross += c1
+        cross *= 2
+        cross += c2
+        mu_cross *= cross
+        mu_squares += c1
+        squares += c2
+        mu_squares *= squares
+        return cv2.divide(mu_cross, mu_squares)
+    
+    def compile_plan(self, baseline_dir="baseline", screenshots_dir="screenshots"):
+        """Karşılaştırma planını bir kez oluşturur
+
+        Plan, sayfa adından special_settings ile çözülmüş ayarlara, dosya yollarına
+        ve morfoloji kernel'ine giden bir sözlüktür; compare_images ve
+        compare_all_pages config'i taramak yerine bu sözlüğe bakar.
+        
+        Kapsamı 'elements' veya 'both' olan sayfalarda seçicisi tanımlı her öğe
+        '<sayfa>__<öğe>' adıyla ayrı bir kayıt olur ve sayfanın ayarlarını kullanır.
+        """
+        default_scope = self.config.get('capture_settings', {}).get('scope', 'page')
+        plan = {}
+        for page_config in self.config.get('test_pages', []):
+            page_name = page_config['name']
+            special_settings = page_config.get('special_settings', {})
+            scope = page_config.get('scope', default_scope)
             
-            # Fark sayısını kontrol et ve uyarı ver
-            different_pixels = np.count_nonzero(diff_mask)
-            if different_pixels > 0:
-                print(f"📊 Fark görüntüsü kaydedildi: {diff_image_path} ({different_pixels} farklı piksel)")
-            else:
-                print(f"📊 Fark görüntüsü kaydedildi: {diff_image_path} (fark tespit edilmedi)")
+            if scope in ('page', 'both'):
+                plan[page_name] = self._build_plan_entry(
+                    special_settings,
+                    os.path.join(baseline_dir, f"{page_name}.png"),
+                    os.path.join(screenshots_dir, f"{page_name}.png")
+                )
             
-            return diff_image_path
+            if scope in ('elements', 'both'):
+                selectors = page_config.get('element_selectors', {})
+                for element_name in page_config.get('elements', []):
+                    if not selectors.get(element_name):
+                        continue
+                    entry_name = f"{page_name}__{element_name}"
+                    entry = self._build_plan_entry(
+                        special_settings,
+                        os.path.join(baseline_dir, f"{entry_name}.png"),
+                        os.path.join(screenshots_dir, f"{entry_name}.png")
+                    )
+                    entry['parent_page'] = page_name
+                    entry['element'] = element_name
+                    plan[entry_name] = entry
+        
+        self._plan = plan
+        return plan
+    
+    def _build_plan_entry(self, special_settings, baseline_path=None, test_path=None):
+        """Tek sayfa için etkin ayarları, yolları ve kernel'i çözer"""
+        kernel_size = special_settings.get('morphology_kernel', self.morphology_kernel)
+        return {
+            'settings': {
+                'tolerance': special_settings.get('tolerance', self.tolerance),
+                'threshold': special_settings.get('threshold', self.threshold),
+                'fail_threshold': special_settings.get('fail_threshold', self.fail_threshold),
+                'min_difference_pixels': special_settings.get('min_difference_pixels', self.min_difference_pixels),
+                'morphology_kernel': kernel_size,
+                'scoring': special_settings.get('scoring', self.scoring),
+                'ssim_threshold': special_settings.get('ssim_threshold', special_settings.get('threshold', self.threshold)),
+                'ssim_fail_threshold': special_settings.get('ssim_fail_threshold', special_settings.get('fail_threshold', self.fail_threshold)),
+                'special': bool(special_settings)
+            },
+            'baseline_path': baseline_path,
+            'test_path': test_path,
+            'kernel': np.ones((kernel_size, kernel_size), np.uint8)
+        }
+    
+    def _plan_entry(self, page_name):
+        """Sayfanın plan kaydını döner; config'de olmayan sayfalar genel ayarları kullanır"""
+        if self._plan is None:
+            self.compile_plan()
+        
+        entry = self._plan.get(page_name)
+        if entry is None:
+            entry = self._build_plan_entry({})
+        return entry
+    
+    def _create_difference_image(self, baseline_color, test_color, diff_mask, page_name):
+        """Fark görüntüsü oluşturur ve kaydeder
+
+        Renkli kareler compare_images'ta çözülmüş olarak gelir ve aynı boyuttadır.
+        """
+        try:
+            combined = self._render_difference_panels(baseline_color, test_color, diff_mask)
+            return self._save_difference_image(combined, np.count_nonzero(diff_mask), page_name)
             
         except Exception as e:
             print(f"❌ Fark görüntüsü oluşturma hatası: {e}")
             return None
     
-    def compare_all_pages(self, baseline_dir="baseline", screenshots_dir="screenshots"):
-        """Tüm sayfaların karşılaştırmasını yapar"""
+    def _create_region_images(self, baseline_color, test_color, regions, tolerance, kernel, page_name):
+        """Değişen bölgeler için kırpılmış fark görüntüleri oluşturur
+
+        Dönen liste bölgelerle aynı sıradadır; oluşturulamayan bölge None olur.
+
+        Maske her kırpıntı için morfoloji erimi kadar geniş bir pencerede yeniden
+        hesaplanır; böylece tam ve şeritli karşılaştırma aynı yolu kullanır.
+        """
+        height, width = baseline_color.shape[:2]
+        overlap = 4 * (kernel.shape[0] // 2)
+        image_paths = []
+        
+        for index, region in enumerate(regions, start=1):
+            try:
+                # Görüntülenecek alan (bölge + kenar boşluğu)
+                x0 = max(0, region['x'] - self.region_padding)
+                y0 = max(0, region['y'] - self.region_padding)
+                x1 = min(width, region['x'] + region['width'] + self.region_padding)
+                y1 = min(height, region['y'] + region['height'] + self.region_padding)
+                
+                # Maskenin hesaplanacağı daha geniş pencere
+                wx0, wy0 = max(0, x0 - overlap), max(0, y0 - overlap)
+                wx1, wy1 = min(width, x1 + overlap), min(height, y1 + overlap)
+                baseline_window = cv2.cvtColor(baseline_color[wy0:wy1, wx0:wx1], cv2.COLOR_BGR2GRAY)
+                test_window = cv2.cvtColor(test_color[wy0:wy1, wx0:wx1], cv2.COLOR_BGR2GRAY)
+                mask = self._difference_mask(baseline_window, test_window, tolerance, kernel)
+                mask = mask[y0 - wy0:y1 - wy0, x0 - wx0:x1 - wx0]
+                
+                combined = self._render_difference_panels(
+                    baseline_color[y0:y1, x0:x1], test_color[y0:y1, x0:x1], mask
+                )
+                image_paths.append(
+                    self._save_difference_image(combined, region['area'], f"{page_name}_region{index}")
+                )
+            except Exception as e:
+                print(f"❌ Bölge görüntüsü oluşturma hatası: {e}")
+                image_paths.append(None)
+        
+        return image_paths
+    
+    def _render_difference_panels(self, baseline_color, test_color, diff_mask):
+        """Referans | test | fark haritası | overlay panellerini yan yana birleştirir"""
+        # Fark maskesini renkli hale getir
+        diff_color = cv2.cvtColor(diff_mask, cv2.COLOR_GRAY2BGR)
+        
+        # Daha anlaşılır ve göze yumuşak renkler kullan
+        # Açık yeşil: Değişmeyen alanlar (güvenli)
+        # Sarı: Değişen alanlar (dikkat edilmesi gereken)
+        # Sadece değişiklikleri turuncu ile işaretle
+        diff_color[diff_mask > 0] = [0, 165, 255]  # BGR formatında turuncu (değişen alanlar)
+        
+        # Değişmeyen alanları beyaz yap (nötr arka plan)
+        unchanged_mask = (diff_mask == 0)
+        diff_color[unchanged_mask] = [255, 255, 255]  # BGR formatında beyaz (değişmeyen alanlar)
+        
+        # Overlay görüntüsü oluştur (sadece değişiklikleri vurgula)
+        overlay = test_color.copy()
+        overlay[diff_mask > 0] = [0, 165, 255]  # Turuncu overlay (değişen alanlar)
+        
+        # Overlay'i şeffaf yap
+        alpha = 0.4  # Biraz daha görünür şeffaflık
+        overlay_image = cv2.addWeighted(test_color, 1-alpha, overlay, alpha, 0)
+        
+        # Görüntüleri yan yana birleştir
+        # 1. Referans görüntü | 2. Test görüntüsü | 3. Fark haritası | 4. Overlay
+        return np.hstack([baseline_color, test_color, diff_color, overlay_image])
+    
+    def _save_difference_image(self, combined, different_pixels, page_name, synchronous=False):
+        """Birleştirilmiş fark görüntüsünü results klasörüne yazar
+
+        compare_all_pages sırasında yazma işi arka plan yazıcısına bırakılır;
+        dosya, compare_all_pages dönmeden önce diskte olur.
+        """
+        # Results klasörünü oluştur
+        results_dir = "results"
+        os.makedirs(results_dir, exist_ok=True)
+        
+        # Fark görüntüsünü kaydet
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        if self.diff_format == 'webp':
+            extension = 'webp'
+            params = [cv2.IMWRITE_WEBP_QUALITY, 101]  # 100'ün üstü kayıpsız WebP
+        else:
+            extension = 'png'
+            params = [cv2.IMWRITE_PNG_COMPRESSION, self.png_compression]
+        diff_image_path = os.path.join(results_dir, f"{page_name}_diff_{timestamp}.{extension}")
+        
+        if self._artifact_writer and not synchronous:
+            # Yazılamazsa compare_all_pages yolu sonuçtan çıkarır
+            self._artifact_writer.submit(diff_image_path, combined, params)
+        elif not cv2.imwrite(diff_image_path, combined, params):
+            print(f"❌ Fark görüntüsü yazılamadı: {diff_image_path}")
+            return None
+        
+        # Fark sayısını kontrol et ve uyarı ver
+        if different_pixels > 0:
+            print(f"📊 Fark görüntüsü kaydedildi: {diff_image_path} ({different_pixels} farklı piksel)")
+        else:
+            print(f"📊 Fark görüntüsü kaydedildi: {diff_image_path} (fark tespit edilmedi)")
+        
+        return diff_image_path
+    
+    def _content_digests(self, baseline_path, test_path):
+        """Referans ve test görüntüsünün (bellekteyse baytlarının) içerik özetlerini döner
+
+        Önbellek anahtarı ve birebir aynı dosya kontrolü bu özetleri paylaşır;
+        her sayfa bir kez özetlenir. Dosya okunamazsa None döner.
+        """
+        try:
+            test_data = self._memory_image(test_path)
+            test_digest = bytes_digest(test_data) if test_data is not None else file_digest(test_path)
+            return file_digest(baseline_path), test_digest
+        except OSError as e:
+            print(f"⚠️ İçerik özeti hesaplanamadı: {e}")
+            return None
+    
+    def _lookup_cached_result(self, baseline_path, test_path, page_name, digests):
+        """Önbellekteki sonucu ve sayfanın önbellek anahtarını döner"""
+        if digests is None:
+            print(f"⚠️ {page_name} için önbellek anahtarı üretilemedi")
+            return None, None
+        
+        settings = dict(self._plan_entry(page_name)['settings'])
+        del settings['special']
+        if self.pyramid_enabled:
+            # Piramit kararları tahmini olduğundan anahtar ayrışmalı
+            settings['pyramid'] = [self.pyramid_levels, self.pyramid_margin]
+        key = self.result_cache.make_key(page_name, digests[0], digests[1], settings)
+        
+        cached = self.result_cache.get(key)
+        if cached is None:
+            return None, key
+        
+        # Fark görüntüsü isteniyorsa ama kayıtta yoksa yeniden hesapla
+        wants_diff = self.save_differences and (self.write_identical_diffs or not cached.get('identical_files'))
+        artifact_key = 'region_image_paths' if self.diff_artifact == 'regions' else 'difference_image_path'
+        if wants_diff and cached.get(artifact_key) is None:
+            return None, key
+        
+        cached['baseline_path'] = baseline_path
+        cached['test_path'] = test_path
+        cached['cached'] = True
+        status = "✅ PASS" if cached['passed'] else "❌ FAIL"
+        print(f"♻️ {status} {page_name}: önbellekten alındı (Benzerlik: {cached['similarity_score']:.2%})")
+        return cached, key
+    
+    def _start_artifact_writer(self):
+        """Fark görüntülerini arka planda yazacak kuyruğu başlatır"""
+        if self.async_writer_enabled and self.save_differences:
+            self._artifact_writer = ArtifactWriter(self.async_writer_max_pending, self.async_writer_threads)
+    
+    def _stop_artifact_writer(self):
+        """Bekleyen tüm fark görüntüleri yazılana kadar bekler, kuyruğu kapatır ve yazılamayan yolları döner"""
+        if not self._artifact_writer:
+            return set()
+        self._artifact_writer.close()
+        failed_paths = set(self._artifact_writer.failed_paths)
+        self._artifact_writer = None
+        return failed_paths
+    
+    def _drop_failed_artifacts(self, result, failed_paths):
+        """Arka planda yazılamayan fark görüntülerinin yollarını sonuçtan çıkarır"""
+        if result.get('difference_image_path') in failed_paths:
+            print(f"⚠️ {result['page_name']}: fark görüntüsü yazılamadı, rapora eklenmeyecek")
+            del result['difference_image_path']
+        if any(path in failed_paths for path in result.get('region_image_paths', [])):
+            print(f"⚠️ {result['page_name']}: bazı bölge görüntüleri yazılamadı, rapora eklenmeyecek")
+            # Bölgelerle sıra hizası korunur
+            result['region_image_paths'] = [
+                None if path in failed_paths else path for path in result['region_image_paths']
+            ]
+    
+    def __getstate__(self):
+        """Süreç havuzuna gönderilirken bellekteki test görüntüleri, plan ve önbellek kopyalanmaz
+
+        Örnek işçiye bir kez (_init_worker) gider; her iş kendi plan kaydını ve
+        görüntüsünü _compare_page_job argümanlarıyla taşır. Önbellek sadece ana
+        süreçte kullanılır.
+        """
+        state = self.__dict__.copy()
+        state['_test_images'] = {}
+        state['_plan'] = {}
+        state['result_cache'] = None
+        return state
+    
+    def _compare_page_safe(self, baseline_path, test_path, page_name, test_data=None, digests=None):
+        """Tek sayfayı karşılaştırır; hata olursa çalışmayı durdurmadan hata sonucu döner"""
+        if test_data is not None:
+            self.add_test_image(test_path, test_data)
+        try:
+            return self.compare_images(baseline_path, test_path, page_name, digests)
+        except Exception as e:
+            print(f"❌ {page_name} karşılaştırma hatası: {e}")
+            return {
+                'success': False,
+                'error': str(e),
+                'page_name': page_name
+            }
+    
+    def _process_pool(self, workers):
+        """Karşılaştırma süreç havuzunu 'spawn' ile başlatır
+
+        Pipeline modunda havuz, çekim thread'i çalışırken kurulur; 'fork'
+        başka bir thread'in tuttuğu kilitleri (Selenium, stdout, kuyruk)
+        çocuk sürece kopyalayıp işçiyi kilitleyebilir. Örnek her işçiye
+        başlangıçta bir kez gönderilir, işlerle birlikte tekrar tekrar değil.
+        """
+        return ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(self,)
+        )
+    
+    def _retry_crashed_page(self, job):
+        """Süreç çökmesiyle düşen sayfayı tek başına, ayrı bir süreçte yeniden dener"""
+        page_name = job[2]
+        try:
+            with self._process_pool(1) as executor:
+                return executor.submit(
+                    _compare_page_job, *job, self._plan_entry(page_name), self._memory_image(job[1])
+                ).result()
+        except BrokenProcessPool as e:
+            print(f"❌ {page_name} karşılaştırması süreci çökertti: {e}")
+            return {
+                'success': False,
+                'error': f'Karşılaştırma süreci çöktü: {e}',
+                'page_name': page_name
+            }
+    
+    def _page_job(self, page_name, plan_entry):
+        """Sayfanın (referans, test, ad) işini döner; dosyalardan biri yoksa None"""
+        baseline_path = plan_entry['baseline_path']
+        test_path = plan_entry['test_path']
+        
+        # Dosyaların varlığını kontrol et
+        if not os.path.exists(baseline_path):
+            print(f"⚠️ Referans görüntü bulunamadı: {baseline_path}")
+            return None
+            
+        if not os.path.exists(test_path) and self._memory_image(test_path) is None:
+            print(f"⚠️ Test görüntüsü bulunamadı: {test_path}")
+            return None
+        
+        return baseline_path, test_path, page_name
+    
+    def compare_all_pages(self, baseline_dir="baseline", screenshots_dir="screenshots", workers=None, ready_pages=None):
+        """Tüm sayfaların karşılaştırmasını yapar
+
+        workers > 1 ise sayfalar bir process havuzuna dağıtılır (0 = CPU sayısı).
+        ready_pages verilirse (çekimi biten sayfa adlarını sırayla üreten bir
+        iterable), her sayfa hazır olur olmaz karşılaştırılır; iterable bitince
+        hiç gelmeyen sayfalar diskteki dosyalarla karşılaştırılır. Sonuçlar her
+        modda config'deki sayfa sırasıyla döner.
+        """
         print("🚀 Tüm sayfaların görsel karşılaştırması başlatılıyor...")
         
-        results = []
+        if workers is None:
+            workers = self.workers
+        if workers <= 0:
+            workers = os.cpu_count() or 1
+        
         passed_count = 0
         total_count = 0
         
-        # Test sayfalarını al
-        test_pages = self.config.get('test_pages', [])
+        # Bu çalışmanın planını oluştur
+        plan = self.compile_plan(baseline_dir, screenshots_dir)
+        page_order = {page_name: index for index, page_name in enumerate(plan)}
         
-        for page_config in test_pages:
-            page_name = page_config['name']
-            baseline_path = os.path.join(baseline_dir, f"{page_name}.png")
-            test_path = os.path.join(screenshots_dir, f"{page_name}.png")
-            
-            # Dosyaların varlığını kontrol et
-            if not os.path.exists(baseline_path):
-                print(f"⚠️ Referans görüntü bulunamadı: {baseline_path}")
-                continue
+        # Hazır gelen bir sayfa, öğe kayıtlarını da hazır kılar
+        page_elements = {}
+        for page_name, plan_entry in plan.items():
+            if plan_entry.get('parent_page'):
+                page_elements.setdefault(plan_entry['parent_page'], []).append(page_name)
+        
+        executor = None
+        if workers > 1 and len(plan) > 1:
+            workers = min(workers, len(plan))
+            print(f"⚙️ Sayfalar {workers} işlemciye dağıtılıyor...")
+            executor = self._process_pool(workers)
+        else:
+            self._start_artifact_writer()
+        
+        jobs = {}
+        results = {}
+        futures = {}
+        crashed = []
+        cache_keys = {}
+        failed_paths = set()
+        try:
+            # Hazır gelen sayfalar önce, kalanlar config sırasıyla
+            ready_entries = (
+                page_name
+                for ready_name in ready_pages or []
+                for page_name in [ready_name] + page_elements.get(ready_name, [])
+            )
+            for page_name in itertools.chain(ready_entries, list(plan)):
+                index = page_order.get(page_name)
+                if index is None or index in jobs:
+                    continue
+                job = self._page_job(page_name, plan[page_name])
+                if job is None:
+                    continue
+                jobs[index] = job
                 
-            if not os.path.exists(test_path):
-                print(f"⚠️ Test görüntüsü bulunamadı: {test_path}")
-                continue
-            
-            # Karşılaştırma yap
-            result = self.compare_images(baseline_path, test_path, page_name)
-            results.append(result)
+                # Önbellekte olan sayfaları yeniden karşılaştırma; özetler hızlı yolda da kullanılır
+                digests = None
+                if self.result_cache:
+                    digests = self._content_digests(job[0], job[1])
+                    cached, cache_keys[index] = self._lookup_cached_result(*job, digests)
+                    if cached:
+                        results[index] = cached
+                        continue
+                
+                # Karşılaştırma yap
+                if executor is None:
+                    results[index] = self._compare_page_safe(*job, digests=digests)
+                    continue
+                try:
+                    futures[index] = executor.submit(
+                        _compare_page_job, *job, plan[page_name], self._memory_image(job[1]), digests
+                    )
+                except BrokenProcessPool:
+                    crashed.append(index)
             
+            for index, future in futures.items():
+                try:
+                    results[index] = future.result()
+                except BrokenProcessPool:
+                    crashed.append(index)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+            else:
+                failed_paths = self._stop_artifact_writer()
+        
+        # Yazılamayan fark görüntüleri önbelleğe ve rapora diskte yokken girmesin
+        if failed_paths:
+            for result in results.values():
+                self._drop_failed_artifacts(result, failed_paths)
+        
+        # Çöken bir süreç havuzdaki tüm bekleyen işleri düşürür; suçlu sayfayı
+        # bulmak için bu sayfaları tek tek, ayrı süreçlerde yeniden dene
+        for index in crashed:
+            results[index] = self._retry_crashed_page(jobs[index])
+        
+        for index, result in results.items():
+            if result['success'] and not result.get('cached') and cache_keys.get(index):
+                self.result_cache.put(cache_keys[index], result)
+        
+        # Öğe sonuçları hangi sayfaya ait olduklarını taşır
+        plan_entries = list(plan.values())
+        for index, result in results.items():
+            if plan_entries[index].get('element'):
+                result['parent_page'] = plan_entries[index]['parent_page']
+                result['element'] = plan_entries[index]['element']
+        
+        results = [results[index] for index in sorted(results)]
+        
+        for result in results:
             if result['success']:
                 total_count += 1
                 if result['passed']:
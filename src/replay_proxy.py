@@ -0,0 +1,254 @@
+import os
+import ssl
+import json
+import hashlib
+import threading
+import subprocess
+import http.client
+from urllib.parse import urlsplit
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from result_cache import atomic_write
+
+
+# Yanıtla birlikte saklanmayan / yeniden üretilen başlıklar
+HOP_BY_HOP_HEADERS = {
+    'connection', 'keep-alive', 'proxy-authenticate', 'proxy-authorization', 'proxy-connection',
+    'te', 'trailer', 'transfer-encoding', 'upgrade', 'content-length'
+}
+
+
+class ReplayProxy:
+    def __init__(self, archive_dir="archive/http", mode="replay", host="127.0.0.1", port=0):
+        """HTTP(S) yanıtlarını kaydeden veya arşivden sunan yerel proxy'yi başlatır
+
+        mode='record' iken istekler gerçek sunucuya iletilir ve yanıtlar
+        arşive yazılır; mode='replay' iken sadece arşivden sunulur, arşivde
+        olmayan istekler 404 alır. HTTPS, CONNECT tünelinde kendinden imzalı
+        sertifikayla açılır (tarayıcı --ignore-certificate-errors ile başlatılmalı).
+        Arşiv: index.json (istek anahtarı -> durum, başlıklar, gövde dosyası)
+        ve içerik özetiyle adlandırılmış bodies/ dosyaları.
+        """
+        self.archive_dir = archive_dir
+        self.mode = mode
+        self.host = host
+        self.port = port
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+        self._index = {}
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+        self._ssl_context = None
+
+        os.makedirs(os.path.join(self.archive_dir, 'bodies'), exist_ok=True)
+        self._load_index()
+
+    @property
+    def address(self):
+        """Tarayıcının --proxy-server argümanı için host:port"""
+        return f"{self.host}:{self.port}"
+
+    @property
+    def entry_count(self):
+        """Arşivdeki yanıt sayısı (sorgu dizesiz yedek anahtarlar sayılmaz)"""
+        return sum(1 for key in self._index if not key.startswith('~'))
+
+    def start(self):
+        """Proxy'yi arka plan thread'inde dinlemeye başlatır"""
+        self._ssl_context = self._create_ssl_context()
+        handler = type('ReplayProxyHandler', (ReplayProxyHandler,), {'proxy': self})
+        self._server = ThreadingHTTPServer((self.host, self.port), handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        print(f"📼 Kayıt/tekrar proxy'si başlatıldı: {self.address} ({self.mode}, {self.entry_count} kayıt)")
+
+    def stop(self):
+        """Proxy'yi durdurur; kaydedilmemiş yeni kayıt varsa arşiv dizinini yazar"""
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        self.save()
+
+    def save(self):
+        """Arşiv dizinini (index.json) atomik olarak yazar"""
+        if not self.recorded:
+            return
+        index_path = os.path.join(self.archive_dir, 'index.json')
+        with self._lock:
+            data = json.dumps(self._index, indent=2)
+        atomic_write(index_path, data)
+        print(f"💾 Arşiv kaydedildi: {self.entry_count} kayıt ({self.recorded} yeni)")
+        self.recorded = 0
+
+    def _load_index(self):
+        try:
+            with open(os.path.join(self.archive_dir, 'index.json'), 'r', encoding='utf-8') as f:
+                self._index = json.load(f)
+        except (OSError, ValueError):
+            self._index = {}
+
+    def _create_ssl_context(self):
+        """CONNECT tünelleri için kendinden imzalı sertifikayı (gerekirse üreterek) yükler"""
+        cert_path = os.path.join(self.archive_dir, 'proxy-cert.pem')
+        key_path = os.path.join(self.archive_dir, 'proxy-key.pem')
+        if not (os.path.exists(cert_path) and os.path.exists(key_path)):
+            try:
+                subprocess.run([
+                    'openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-days', '3650',
+                    '-subj', '/CN=ui-sentinel-replay', '-keyout', key_path, '-out', cert_path
+                ], check=True, capture_output=True, timeout=60)
+            except (OSError, subprocess.SubprocessError) as e:
+                print(f"⚠️ Proxy sertifikası üretilemedi, HTTPS kaydı/tekrarı devre dışı: {e}")
+                return None
+
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(cert_path, key_path)
+        return context
+
+    def request_key(self, method, url, body):
+        """İstek anahtarı: yöntem + URL (+ gövdeli isteklerde gövde özeti)"""
+        key = f"{method} {url}"
+        if body:
+            key += f" {hashlib.blake2b(body, digest_size=12).hexdigest()}"
+        return key
+
+    def loose_key(self, method, url):
+        """Sorgu dizesi değişen (zaman damgalı vb.) istekler için yedek anahtar"""
+        parts = urlsplit(url)
+        return f"~{method} {parts.scheme}://{parts.netloc}{parts.path}"
+
+    def lookup(self, method, url, body):
+        """Arşivdeki yanıtı (durum, başlıklar, gövde) döner; yoksa None"""
+        with self._lock:
+            entry = self._index.get(self.request_key(method, url, body))
+            if entry is None:
+                entry = self._index.get(self._index.get(self.loose_key(method, url), ''))
+        if entry is None:
+            self.misses += 1
+            return None
+
+        try:
+            with open(os.path.join(self.archive_dir, entry['body']), 'rb') as f:
+                data = f.read()
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry['status'], entry['headers'], data
+
+    def record(self, method, url, body, status, headers, data):
+        """Yanıtı arşive ekler; gövdeler içerik özetine göre bir kez yazılır"""
+        body_name = os.path.join('bodies', hashlib.blake2b(data, digest_size=20).hexdigest())
+        body_path = os.path.join(self.archive_dir, body_name)
+        if not os.path.exists(body_path):
+            atomic_write(body_path, data)
+
+        key = self.request_key(method, url, body)
+        with self._lock:
+            self._index[key] = {'status': status, 'headers': headers, 'body': body_name}
+            self._index[self.loose_key(method, url)] = key
+            self.recorded += 1
+
+
+class ReplayProxyHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    proxy = None
+    tunnel_host = None
+
+    def log_message(self, format, *args):
+        # Her istek için konsola yazma
+        pass
+
+    def do_CONNECT(self):
+        """HTTPS tünelini kendinden imzalı sertifikayla açar ve içindeki istekleri işler"""
+        if self.proxy._ssl_context is None:
+            self.send_error(501, 'HTTPS desteklenmiyor')
+            return
+
+        self.send_response(200, 'Connection Established')
+        self.end_headers()
+        try:
+            tls_connection = self.proxy._ssl_context.wrap_socket(self.connection, server_side=True)
+        except (ssl.SSLError, OSError):
+            self.close_connection = True
+            return
+
+        # Aynı handler döngüsü tünel içindeki istekleri okumaya devam eder
+        self.tunnel_host = self.path
+        self.connection = tls_connection
+        self.rfile = tls_connection.makefile('rb', self.rbufsize)
+        self.wfile = tls_connection.makefile('wb', self.wbufsize)
+        self.close_connection = False
+
+    def _handle(self):
+        if self.tunnel_host:
+            host, _, port = self.tunnel_host.partition(':')
+            netloc = host if port in ('', '443') else self.tunnel_host
+            url = f"https://{netloc}{self.path}"
+        else:
+            url = self.path
+
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+
+        if self.proxy.mode == 'record':
+            response = self._forward(url, body)
+            if response is None:
+                self.send_error(502, 'Kaynak sunucuya ulaşılamadı')
+                return
+            self.proxy.record(self.command, url, body, *response)
+        else:
+            response = self.proxy.lookup(self.command, url, body)
+            if response is None:
+                self.send_response(404)
+                self.send_header('Content-Length', '0')
+                self.send_header('X-UI-Sentinel-Replay', 'miss')
+                self.end_headers()
+                return
+
+        status, headers, data = response
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(data)
+
+    def _forward(self, url, body):
+        """İsteği gerçek sunucuya iletir, (durum, başlıklar, gövde) döner"""
+        parts = urlsplit(url)
+        path = parts.path or '/'
+        if parts.query:
+            path += f"?{parts.query}"
+
+        if parts.scheme == 'https':
+            connection = http.client.HTTPSConnection(parts.hostname, parts.port or 443, timeout=30)
+        else:
+            connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+
+        headers = {
+            name: value for name, value in self.headers.items()
+            if name.lower() not in HOP_BY_HOP_HEADERS
+        }
+        try:
+            connection.request(self.command, path, body=body or None, headers=headers)
+            response = connection.getresponse()
+            data = response.read()
+        except (OSError, http.client.HTTPException) as e:
+            print(f"⚠️ Proxy isteği başarısız: {url} ({e})")
+            return None
+        finally:
+            connection.close()
+
+        response_headers = [
+            [name, value] for name, value in response.getheaders()
+            if name.lower() not in HOP_BY_HOP_HEADERS
+        ]
+        return response.status, response_headers, data
+
+    do_GET = do_POST = do_HEAD = do_PUT = do_DELETE = do_OPTIONS = do_PATCH = _handle
@@ -2,6 +2,7 @@ import json
 import os
 from datetime import datetime
 from jinja2 import Template
+from PIL import Image
 import base64
 
 
@@ -501,6 +502,58 @@ class ReportGenerator:
                     box-shadow: 0 6px 16px rgba(0, 0, 0, 0.2);
                 }
 
+                /* Changed Regions (diff_artifact: regions) */
+                .region-overlay {
+                    position: relative;
+                    display: inline-block;
+                    max-width: 100%;
+                    margin-bottom: 15px;
+                    border: 3px solid #dee2e6;
+                    border-radius: 12px;
+                    overflow: hidden;
+                }
+                
+                .region-overlay img {
+                    display: block;
+                    max-width: 100%;
+                    height: auto;
+                }
+                
+                .region-overlay svg {
+                    position: absolute;
+                    top: 0;
+                    left: 0;
+                    width: 100%;
+                    height: 100%;
+                }
+                
+                .region-box {
+                    fill: rgba(255, 165, 0, 0.15);
+                    stroke: #ff8c00;
+                    stroke-width: 3;
+                    vector-effect: non-scaling-stroke;
+                }
+                
+                .region-thumbnails {
+                    display: grid;
+                    grid-template-columns: repeat(auto-fill, minmax(280px, 1fr));
+                    gap: 15px;
+                }
+                
+                .region-thumbnail {
+                    text-align: center;
+                    font-size: 0.9rem;
+                    color: #495057;
+                }
+                
+                .region-thumbnail img {
+                    width: 100%;
+                    height: auto;
+                    border: 2px solid #dee2e6;
+                    border-radius: 8px;
+                    margin-bottom: 5px;
+                }
+
                 /* Simple Color Legend */
                 .color-legend-simple {
                     display: flex;
@@ -993,7 +1046,7 @@ class ReportGenerator:
                     {% for result in test_results %}
                     <div class="test-detail">
                         <div class="test-header">
-                            <h3 class="test-name">{{ result.page_name|title }}</h3>
+                            <h3 class="test-name">{% if result.element %}{{ result.parent_page|title }} › {{ result.element }}{% else %}{{ result.page_name|title }}{% endif %}</h3>
                             <span class="test-status {% if result.passed %}passed{% else %}failed{% endif %}">
                                 {% if result.passed %}PASSED{% else %}FAILED{% endif %}
                             </span>
@@ -1075,16 +1128,45 @@ class ReportGenerator:
                                 </div>
                             </div>
 
+                            {% if result.diff_map_base64 %}
                             <!-- Single Difference Map -->
                             <div class="difference-map-section">
                                 <h3 class="section-title">Difference Map</h3>
                                 <div class="difference-map-container">
-                                    <img src="data:image/png;base64,{{ result.diff_map_base64 }}" 
+                                    <img src="data:{{ result.diff_map_mime }};base64,{{ result.diff_map_base64 }}" 
                                          onclick="openLightbox(event, 'diff')" 
                                          alt="Difference Map"
                                          class="difference-map-image">
                                 </div>
                                 </div>
+                            {% elif result.region_images %}
+                            <!-- Changed Regions -->
+                            <div class="difference-map-section">
+                                <h3 class="section-title">Changed Regions ({{ result.diff_region_count }})</h3>
+                                <div class="difference-map-container">
+                                    {% if result.test_image_base64 and result.image_width %}
+                                    <div class="region-overlay">
+                                        <img src="data:image/png;base64,{{ result.test_image_base64 }}" alt="Changed Regions">
+                                        <svg viewBox="0 0 {{ result.image_width }} {{ result.image_height }}" preserveAspectRatio="none">
+                                            {% for region in result.region_images %}
+                                            <rect class="region-box" x="{{ region.x }}" y="{{ region.y }}" width="{{ region.width }}" height="{{ region.height }}"></rect>
+                                            {% endfor %}
+                                        </svg>
+                                    </div>
+                                    {% endif %}
+                                    <div class="region-thumbnails">
+                                        {% for region in result.region_images %}
+                                        <div class="region-thumbnail">
+                                            {% if region.base64 %}
+                                            <img src="data:{{ region.mime }};base64,{{ region.base64 }}" alt="Region {{ loop.index }}">
+                                            {% endif %}
+                                            <span>#{{ loop.index }} · x={{ region.x }}, y={{ region.y }} · {{ region.width }}×{{ region.height }} px</span>
+                                        </div>
+                                        {% endfor %}
+                                    </div>
+                                </div>
+                            </div>
+                            {% endif %}
 
                             <!-- Simple Color Legend -->
                             <div class="color-legend-simple">
@@ -1225,6 +1307,26 @@ class ReportGenerator:
             if result.get('difference_image_path') and os.path.exists(result['difference_image_path']):
                 processed_result['diff_map_base64'] = self._image_to_base64(result['difference_image_path'])
                 processed_result['overlay_image_base64'] = self._image_to_base64(result['difference_image_path'])
+                processed_result['diff_map_mime'] = 'image/webp' if result['difference_image_path'].endswith('.webp') else 'image/png'
+            
+            # Bölge modunda tam fark görüntüsü yoktur: kırpıntılar ve test görüntüsü
+            # üzerindeki sınır kutuları gösterilir
+            if result.get('diff_regions'):
+                region_paths = result.get('region_image_paths', [])
+                processed_result['region_images'] = []
+                for index, region in enumerate(result['diff_regions']):
+                    region_image = dict(region)
+                    if index < len(region_paths) and region_paths[index] and os.path.exists(region_paths[index]):
+                        region_image['base64'] = self._image_to_base64(region_paths[index])
+                        region_image['mime'] = 'image/webp' if region_paths[index].endswith('.webp') else 'image/png'
+                    processed_result['region_images'].append(region_image)
+                
+                if os.path.exists(test_path):
+                    try:
+                        with Image.open(test_path) as image:
+                            processed_result['image_width'], processed_result['image_height'] = image.size
+                    except OSError as e:
+                        print(f"⚠️ Test görüntüsü boyutu okunamadı: {e}")
             
             processed_results.append(processed_result)
         
@@ -0,0 +1,134 @@
+import os
+import json
+import hashlib
+import threading
+
+
+def file_digest(path, chunk_size=1024 * 1024):
+    """Dosyanın içerik özetini (blake2b) hesaplar"""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def bytes_digest(data):
+    """Bellekteki verinin file_digest ile aynı biçimde içerik özetini hesaplar"""
+    return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+
+def atomic_write(path, data):
+    """Veriyi geçici dosyaya yazıp os.replace ile yerine taşır; yarım dosya görünmez
+
+    data bayt, metin (UTF-8) veya ikili dosya nesnesine yazan bir fonksiyon
+    olabilir. Geçici dosya adı süreç ve thread kimliğini içerir; hata
+    durumunda geçici dosya silinir ve hata çağırana iletilir.
+    """
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(temp_path, 'wb') as f:
+            if callable(data):
+                data(f)
+            else:
+                f.write(data.encode('utf-8') if isinstance(data, str) else data)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+class ResultCache:
+    # Sonuç formatı değişirse eski kayıtların kullanılmaması için artırılır
+    CACHE_VERSION = 1
+
+    def __init__(self, cache_dir=".cache/comparison", max_size_mb=256):
+        """Karşılaştırma sonuçları için disk önbelleğini başlatır"""
+        self.cache_dir = cache_dir
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self._size_bytes = None
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def make_key(self, page_name, baseline_digest, test_digest, settings):
+        """Sayfa adı, referans/test içerik özetleri ve etkin ayarlardan önbellek anahtarı üretir
+
+        Özetler (file_digest / bytes_digest) çağıran tarafça bir kez hesaplanır;
+        aynı özetler birebir aynı dosya kontrolünde de kullanılır.
+        """
+        payload = json.dumps({
+            'version': self.CACHE_VERSION,
+            'page_name': page_name,
+            'baseline': baseline_digest,
+            'test': test_digest,
+            'settings': settings
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """Önbellekteki sonucu döner; yoksa veya fark görüntüsü silinmişse None"""
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, 'r', encoding='utf-8') as f:
+                result = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        # Fark görüntüleri artık yoksa kayıt işe yaramaz
+        artifact_paths = [result.get('difference_image_path')] + result.get('region_image_paths', [])
+        if any(path and not os.path.exists(path) for path in artifact_paths):
+            return None
+
+        # Son kullanım zamanını güncelle (tahliye sırası için)
+        try:
+            os.utime(entry_path)
+        except OSError:
+            pass
+
+        return result
+
+    def put(self, key, result):
+        """Sonucu önbelleğe yazar ve boyut sınırını korur"""
+        entry_path = self._entry_path(key)
+        current_size = self._current_size()
+        try:
+            old_size = os.path.getsize(entry_path) if os.path.exists(entry_path) else 0
+            atomic_write(entry_path, json.dumps(result, ensure_ascii=False))
+        except (OSError, TypeError, ValueError) as e:
+            print(f"⚠️ Önbelleğe yazılamadı: {e}")
+            return
+
+        self._size_bytes = current_size - old_size + os.path.getsize(entry_path)
+        if self._size_bytes > self.max_size_bytes:
+            self._evict()
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _current_size(self):
+        """Önbellek boyutunu ilk ihtiyaçta hesaplar, sonra artımlı takip eder"""
+        if self._size_bytes is None:
+            self._size_bytes = sum(size for _, _, size in self._entries())
+        return self._size_bytes
+
+    def _entries(self):
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name.endswith('.json'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, entry.path, stat.st_size))
+        return entries
+
+    def _evict(self):
+        """En uzun süredir kullanılmayan kayıtları sınırın altına inene kadar siler"""
+        entries = sorted(self._entries())
+        total = sum(size for _, _, size in entries)
+        for _, path, size in entries:
+            if total <= self.max_size_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+        self._size_bytes = total
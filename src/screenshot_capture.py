@@ -1,16 +1,126 @@
 import os
+import re
+import base64
 import time
+import queue
+import shutil
+import subprocess
+import tempfile
+from urllib.parse import urlparse
+import threading
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
+from selenium.common.exceptions import SessionNotCreatedException
 from PIL import Image
 import json
 import cv2
 import numpy as np
+from artifact_writer import ArtifactWriter
+from replay_proxy import ReplayProxy
+from result_cache import atomic_write
+
+
+DURATION_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+
+CHROME_BINARIES = ['google-chrome', 'google-chrome-stable', 'chromium', 'chromium-browser', 'chrome']
+
+
+def detect_chrome_version(chrome_binary=None):
+    """Kurulu Chrome'un sürümünü döner (örn. '120.0.6099.109'); bulunamazsa None"""
+    candidates = [chrome_binary] if chrome_binary else CHROME_BINARIES
+    for candidate in candidates:
+        binary = shutil.which(candidate) or (candidate if os.path.isfile(candidate) else None)
+        if not binary:
+            continue
+        try:
+            output = subprocess.run(
+                [binary, '--version'], capture_output=True, text=True, timeout=10
+            ).stdout
+        except (OSError, subprocess.SubprocessError):
+            continue
+        match = re.search(r'(\d+(?:\.\d+)+)', output)
+        if match:
+            return match.group(1)
+    return None
+
+
+def parse_baseline_policy(policy):
+    """Referans politikasını (mod, saniye cinsinden azami yaş) çiftine çevirir"""
+    policy = policy.strip().lower()
+    if policy in ('always', 'if-missing'):
+        return policy, None
+    
+    if policy.startswith('max-age='):
+        duration = policy[len('max-age='):]
+        unit = duration[-1:] if duration[-1:] in DURATION_UNITS else 's'
+        value = duration[:-1] if duration[-1:] in DURATION_UNITS else duration
+        try:
+            return 'max-age', float(value) * DURATION_UNITS[unit]
+        except ValueError:
+            pass
+    
+    raise ValueError(f"Geçersiz referans politikası: {policy} (always, if-missing veya max-age=<süre>)")
+
+
+class NetworkMonitor:
+    # Chrome performans logundaki istek yaşam döngüsü olayları
+    REQUEST_STARTED = 'Network.requestWillBeSent'
+    REQUEST_DONE = ('Network.loadingFinished', 'Network.loadingFailed')
+    
+    def __init__(self, driver):
+        """Bir oturumun devam eden ağ isteklerini performans logu üzerinden izler
+
+        Oluşturulurken loga birikmiş önceki olaylar atılır; bu yüzden sayfaya
+        gitmeden hemen önce oluşturulmalıdır.
+        """
+        self.driver = driver
+        self.in_flight = set()
+        self.total_requests = 0
+        self.blocked_requests = 0
+        self.last_activity = time.time()
+        self.available = True
+        self._read_events()
+        self.in_flight.clear()
+        self.total_requests = 0
+        self.blocked_requests = 0
+    
+    def poll(self):
+        """Yeni olayları işler ve devam eden istek sayısını döner"""
+        self._read_events()
+        return len(self.in_flight)
+    
+    def _read_events(self):
+        try:
+            entries = self.driver.get_log('performance')
+        except Exception:
+            # Performans logu kapalıysa ağ takibi yapılamaz
+            self.available = False
+            return
+        
+        for entry in entries:
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, TypeError, ValueError):
+                continue
+            method = message.get('method')
+            request_id = message.get('params', {}).get('requestId')
+            # Olayın tarayıcıdaki zamanı (ms); okunma anı değil
+            event_time = entry.get('timestamp', time.time() * 1000) / 1000
+            if method == self.REQUEST_STARTED:
+                if request_id not in self.in_flight:
+                    self.total_requests += 1
+                self.in_flight.add(request_id)
+                self.last_activity = max(self.last_activity, event_time)
+            elif method in self.REQUEST_DONE:
+                self.in_flight.discard(request_id)
+                self.last_activity = max(self.last_activity, event_time)
+                # Network.setBlockedURLs ile engellenen istekler blockedReason taşır
+                if message.get('params', {}).get('blockedReason'):
+                    self.blocked_requests += 1
 
 
 class ScreenshotCapture:
@@ -19,8 +129,78 @@ class ScreenshotCapture:
         self.config_file = config_file
         self.config = self._load_config()
         self.driver = None
+        self.drivers = []
         self.screenshots_dir = "screenshots"
         
+        # Paralel Chrome oturumu sayısı (1 = tek oturum, sıralı çekim)
+        self.sessions = max(1, self.config.get('capture_settings', {}).get('sessions', 1))
+        
+        # Sayfa bekleme stratejisi: 'fixed' (wait_time kadar uyu) veya 'stable'
+        # (ardışık düşük çözünürlüklü kareler eşleşene kadar, en fazla wait_time)
+        capture_settings = self.config.get('capture_settings', {})
+        # Liste verilirse stratejiler sırayla, ortak üst sınır içinde uygulanır
+        # (ör. ["network-idle", "stable"]); 'network-idle' istek trafiği durana kadar bekler
+        self.wait_strategy = capture_settings.get('wait_strategy', 'fixed')
+        self.wait_strategies = self.wait_strategy if isinstance(self.wait_strategy, list) else [self.wait_strategy]
+        # Engellenecek URL desenleri ('*' joker); suite geneli + sayfa özel (blocked_urls)
+        self.blocked_urls = capture_settings.get('blocked_urls', [])
+        
+        # Ağ olayları ağ boşta beklemesi veya engelleme sayımı için izlenir
+        self.track_network = 'network-idle' in self.wait_strategies or bool(self.blocked_urls) or any(
+            page_config.get('blocked_urls') for page_config in self.config.get('test_pages', [])
+        )
+        network_idle = capture_settings.get('network_idle', {})
+        self.network_idle_ms = network_idle.get('idle_ms', 500)
+        self.network_max_inflight = network_idle.get('max_inflight', 0)
+        self.network_poll_interval = network_idle.get('poll_interval', 0.1)
+        stability = capture_settings.get('stability', {})
+        self.stability_interval = stability.get('interval', 0.25)
+        self.stability_frames = max(2, stability.get('consecutive_frames', 3))
+        self.stability_tolerance = stability.get('tolerance', 0.001)
+        self.stability_pixel_tolerance = stability.get('pixel_tolerance', 8)
+        self.stability_scale = stability.get('scale', 0.25)
+        
+        # Bellek modu: test ekran görüntüleri PNG baytları olarak tutulur ve
+        # karşılaştırmaya doğrudan verilir; diske yazım isteğe bağlı ve arka planda
+        in_memory = capture_settings.get('in_memory', {})
+        self.in_memory = in_memory.get('enabled', False)
+        self.captured_images = {}
+        self.screenshot_writer = None
+        if self.in_memory and in_memory.get('write_files', True):
+            self.screenshot_writer = ArtifactWriter(in_memory.get('max_pending', 8))
+        
+        # Tam sayfa modu: belge kaydırılarak görünüm dilimleri tek bir diziye dikilir
+        full_page = capture_settings.get('full_page', {})
+        self.full_page_enabled = full_page.get('enabled', False)
+        self.full_page_max_height = full_page.get('max_height', 20000)
+        self.full_page_scroll_delay = full_page.get('scroll_delay', 0.1)
+        self.full_page_hide_sticky = full_page.get('hide_sticky', True)
+        
+        # Deterministik çizim: animasyonlar dondurulur, sabit beklemeler atlanır ve
+        # kararlılık beklemesi ilk eşleşen karede biter;
+        # virtual_time_budget_ms > 0 ise zamanlayıcılar sanal zamanla ileri sarılır
+        deterministic = capture_settings.get('deterministic', {})
+        self.deterministic = deterministic.get('enabled', False)
+        self.virtual_time_budget_ms = deterministic.get('virtual_time_budget_ms', 0)
+        
+        # Kayıt/tekrar: 'record' iken referans çekimi yanıtları arşive yazar, test
+        # çekimi arşivden sunulur; 'replay' iken her çekim arşivden sunulur
+        replay = capture_settings.get('replay', {})
+        self.replay_mode = replay.get('mode', 'off')
+        self.replay_proxy = None
+        if self.replay_mode in ('record', 'replay'):
+            self.replay_proxy = ReplayProxy(replay.get('archive', 'archive/http'), 'replay', port=replay.get('port', 0))
+            self.replay_proxy.start()
+        
+        # Öğe ekran görüntüleri: sayfa adı -> {öğe adı: yol}
+        self.element_paths = {}
+        
+        # Sayfa başına çekim ölçümleri (ör. fiilen beklenen süre)
+        self.page_metrics = {}
+        
+        # chromedriver yolu bir kez çözülür, havuzdaki tüm oturumlar kullanır
+        self.driver_path = None
+        
         # Browser ayarlarını yapılandır
         self.setup_browser()
     
@@ -36,25 +216,9 @@ class ScreenshotCapture:
     def setup_browser(self):
         """Browser ayarlarını yapılandırır"""
         try:
-            from selenium import webdriver
-            from selenium.webdriver.chrome.service import Service
-            from webdriver_manager.chrome import ChromeDriverManager
-            from selenium.webdriver.chrome.options import Options
-            
-            # Chrome options - minimal ayarlar
-            chrome_options = Options()
-            
-            # Headless modu KESINLIKLE KAPAT
-            # chrome_options.add_argument("--headless")
-            
-            # Temel ayarlar
-            chrome_options.add_argument("--no-sandbox")
-            chrome_options.add_argument("--disable-dev-shm-usage")
-            chrome_options.add_argument("--window-size=1920,1080")
-            
-            # WebDriver'ı başlat
-            service = Service(ChromeDriverManager().install())
-            self.driver = webdriver.Chrome(service=service, options=chrome_options)
+            self.driver_path = self._resolve_driver_path()
+            self.driver = self._create_driver()
+            self.drivers = [self.driver]
             
             print("✅ Chrome WebDriver başarıyla başlatıldı")
             
@@ -62,18 +226,502 @@ class ScreenshotCapture:
             print(f"❌ WebDriver başlatma hatası: {e}")
             raise
     
-    def capture_screenshot(self, page_config):
-        """Belirtilen sayfanın ekran görüntüsünü alır"""
+    def _create_driver(self):
+        """Yeni bir Chrome WebDriver oturumu başlatır"""
+        from selenium import webdriver
+        from selenium.webdriver.chrome.service import Service
+        from selenium.webdriver.chrome.options import Options
+        
+        # Chrome options - minimal ayarlar
+        chrome_options = Options()
+        
+        # Pencere/görünüm alanı ve ölçek config'in browser bölümünden gelir
+        browser_config = self.config.get('browser', {})
+        window_size = browser_config.get('window_size', {})
+        width = window_size.get('width', 1920)
+        height = window_size.get('height', 1080)
+        scale_factor = browser_config.get('device_scale_factor', 1)
+        
+        # Temel ayarlar
+        chrome_options.add_argument("--no-sandbox")
+        chrome_options.add_argument("--disable-dev-shm-usage")
+        chrome_options.add_argument(f"--window-size={width},{height}")
+        
+        # Headless: ekran sunucusu gerekmez; ölçek sabitlenir, GPU ve renk profili
+        # farkları kapatılır, kaydırma çubukları görüntüye girmez
+        if browser_config.get('headless', False):
+            chrome_options.add_argument("--headless=new")
+            chrome_options.add_argument("--disable-gpu")
+            chrome_options.add_argument("--hide-scrollbars")
+            chrome_options.add_argument("--force-color-profile=srgb")
+            chrome_options.add_argument(f"--force-device-scale-factor={scale_factor}")
+        
+        # Tüm trafik yerel kayıt/tekrar proxy'sinden geçer; HTTPS kendinden imzalı sertifikayla
+        if self.replay_proxy:
+            chrome_options.add_argument(f"--proxy-server=http://{self.replay_proxy.address}")
+            chrome_options.add_argument("--ignore-certificate-errors")
+        
+        # Ağ boşta beklemesi ve engelleme sayımı için istek olaylarını performans loguna yaz
+        if self.track_network:
+            chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+        
+        # WebDriver'ı başlat
+        service = Service(self.driver_path or self._resolve_driver_path())
+        try:
+            driver = webdriver.Chrome(service=service, options=chrome_options)
+        except SessionNotCreatedException as e:
+            if self.config.get('browser', {}).get('driver_path'):
+                raise
+            # Önbellekteki chromedriver güncellenen Chrome ile uyuşmuyor olabilir:
+            # kayıt atılır, yol bir kez yeniden çözülür
+            print(f"⚠️ Önbellekteki chromedriver ile oturum açılamadı, yeniden çözülüyor: {e.msg}")
+            self.driver_path = self._resolve_driver_path(refresh=True)
+            driver = webdriver.Chrome(service=Service(self.driver_path), options=chrome_options)
+        # Görünüm alanı sadece headless'ta sabitlenir; headed pencerede görünüm
+        # alanı pencere eksi çerçevedir ve mevcut referanslar bu boyuttadır
+        if browser_config.get('headless', False):
+            self._apply_viewport(driver, width, height, scale_factor)
+        self._install_injections(driver)
+        return driver
+    
+    def _apply_viewport(self, driver, width, height, scale_factor):
+        """Görünüm alanını pencere çerçevesinden bağımsız olarak tam width x height ve sabit ölçeğe ayarlar"""
+        try:
+            driver.execute_cdp_cmd('Emulation.setDeviceMetricsOverride', {
+                'width': width,
+                'height': height,
+                'deviceScaleFactor': scale_factor,
+                'mobile': False
+            })
+        except Exception as e:
+            print(f"⚠️ Görünüm alanı ayarlanamadı, pencere boyutu kullanılacak: {e}")
+    
+    def _inject_source(self, page_config):
+        """Sayfanın inject kaydındaki stil ve betiklerden, sadece o sayfanın
+        host'unda çalışan tek bir betik kaynağı üretir"""
+        inject = page_config.get('inject') or {}
+        styles = inject.get('styles', [])
+        scripts = inject.get('scripts', [])
+        # Yönlendirmeler için (ör. ülke alan adları) inject.hosts ile host listesi verilebilir
+        host = urlparse(page_config['url']).hostname or ''
+        hosts = inject.get('hosts') or [host[4:] if host.startswith('www.') else host]
+        if not any(hosts) or not (styles or scripts):
+            return ''
+        
+        parts = []
+        if styles:
+            parts.append(f"""
+                const css = {json.dumps(chr(10).join(styles))};
+                const addStyle = () => {{
+                    const style = document.createElement('style');
+                    style.textContent = css;
+                    (document.head || document.documentElement).appendChild(style);
+                }};
+                if (document.documentElement) {{
+                    addStyle();
+                }} else {{
+                    new MutationObserver((_, observer) => {{
+                        if (document.documentElement) {{ observer.disconnect(); addStyle(); }}
+                    }}).observe(document, {{childList: true}});
+                }}
+            """)
+        if scripts:
+            # Betikler belge oluşturulurken (<html> bile yokken) çalışır; DOM'a
+            # erişebilmeleri için DOMContentLoaded'a ertelenir
+            runs = chr(10).join(
+                f"try {{ {script} }} catch (e) {{ console.warn('ui-sentinel inject', e); }}" for script in scripts
+            )
+            parts.append(f"""
+                const runScripts = () => {{
+                    {runs}
+                }};
+                if (document.readyState === 'loading') {{
+                    document.addEventListener('DOMContentLoaded', runScripts, {{once: true}});
+                }} else {{
+                    runScripts();
+                }}
+            """)
+        
+        return f"""
+            (() => {{
+                const hosts = {json.dumps(hosts)};
+                const hostname = location.hostname;
+                if (!hosts.some(host => hostname === host || hostname.endsWith('.' + host))) return;
+                {chr(10).join(parts)}
+            }})();
+        """
+    
+    # Deterministik çizim: CSS animasyon/geçişleri, imleç yanıp sönmesi ve
+    # medya oynatma kapatılır; Web Animations API animasyonları yüklemede bitirilir
+    FREEZE_SOURCE = """
+        (() => {
+            const css = `*, *::before, *::after {
+                animation-delay: 0s !important; animation-duration: 0s !important;
+                animation-iteration-count: 1 !important; animation-play-state: paused !important;
+                transition: none !important; caret-color: transparent !important;
+                scroll-behavior: auto !important;
+            }`;
+            const addStyle = () => {
+                const style = document.createElement('style');
+                style.textContent = css;
+                (document.head || document.documentElement).appendChild(style);
+            };
+            if (document.documentElement) { addStyle(); }
+            else { document.addEventListener('DOMContentLoaded', addStyle, {once: true}); }
+            
+            document.addEventListener('play', event => {
+                event.target.pause();
+                event.target.currentTime = 0;
+            }, true);
+            window.addEventListener('load', () => {
+                document.querySelectorAll('video, audio').forEach(media => media.pause());
+                (document.getAnimations ? document.getAnimations() : []).forEach(animation => {
+                    try { animation.finish(); } catch (e) { animation.cancel(); }
+                });
+            });
+        })();
+    """
+    
+    def _install_injections(self, driver):
+        """Tüm sayfaların inject kayıtlarını (ve deterministik modda dondurma
+        betiğini) oturuma bir kez, belge oluşturulurken çalışacak şekilde
+        (Page.addScriptToEvaluateOnNewDocument) kurar"""
+        sources = [self._inject_source(page_config) for page_config in self.config.get('test_pages', [])]
+        sources = [source for source in sources if source]
+        page_count = len(sources)
+        if self.deterministic:
+            sources.insert(0, self.FREEZE_SOURCE)
+        if not sources:
+            return
+        
+        try:
+            driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': chr(10).join(sources)})
+            print(f"💉 {page_count} sayfa için ön yükleme betikleri kuruldu"
+                  f"{' (animasyonlar donduruldu)' if self.deterministic else ''}")
+        except Exception as e:
+            print(f"⚠️ Ön yükleme betikleri kurulamadı: {e}")
+    
+    def _resolve_driver_path(self, refresh=False):
+        """chromedriver yolunu döner: config'deki driver_path, yoksa yerel önbellek
+
+        Önbellek kurulu Chrome sürümüne göre tutulur; sürüm değişmedikçe ve
+        kayıtlı dosya duruyorsa ağ erişimi olmadan doğrudan kullanılır.
+        ChromeDriverManager yalnızca önbellekte geçerli kayıt yoksa çağrılır.
+        Chrome sürümü bulunamazsa önbellek kullanılmaz (güncellemede
+        geçersizleştirilemez); refresh=True mevcut kaydı yok sayıp yeniler.
+        """
+        browser_config = self.config.get('browser', {})
+        
+        driver_path = browser_config.get('driver_path')
+        if driver_path:
+            if not os.path.isfile(driver_path):
+                raise FileNotFoundError(f"chromedriver bulunamadı: {driver_path}")
+            return driver_path
+        
+        cache_path = browser_config.get('driver_cache', '.cache/chromedriver.json')
+        chrome_version = detect_chrome_version(browser_config.get('chrome_binary'))
+        
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            cached = {}
+        
+        cached_path = cached.get(chrome_version) if chrome_version and not refresh else None
+        if cached_path and os.path.isfile(cached_path):
+            print(f"📦 Önbellekteki chromedriver kullanılıyor (Chrome {chrome_version})")
+            return cached_path
+        
+        from webdriver_manager.chrome import ChromeDriverManager
+        print(f"⬇️ chromedriver çözülüyor (Chrome {chrome_version or 'sürümü bilinmiyor'})...")
+        driver_path = ChromeDriverManager().install()
+        
+        if not chrome_version:
+            return driver_path
+        
+        cached[chrome_version] = driver_path
+        try:
+            os.makedirs(os.path.dirname(cache_path) or '.', exist_ok=True)
+            atomic_write(cache_path, json.dumps(cached, indent=2))
+        except OSError as e:
+            print(f"⚠️ chromedriver önbelleği yazılamadı: {e}")
+        
+        return driver_path
+    
+    def _ensure_pool(self, size):
+        """Oturum havuzunu istenen boyuta kadar paralel olarak genişletir
+
+        Yeniden başlatılamayan (None) oturum yuvaları sayılmaz ve havuzdan atılır.
+        """
+        self.drivers = [driver for driver in self.drivers if driver is not None]
+        missing = size - len(self.drivers)
+        if missing <= 0:
+            return
+        
+        print(f"🧵 {missing} ek Chrome oturumu başlatılıyor...")
+        created = []
+        lock = threading.Lock()
+        
+        def start_driver():
+            try:
+                driver = self._create_driver()
+                with lock:
+                    created.append(driver)
+            except Exception as e:
+                print(f"⚠️ Ek Chrome oturumu başlatılamadı: {e}")
+        
+        threads = [threading.Thread(target=start_driver) for _ in range(missing)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.drivers.extend(created)
+        self.driver = self.drivers[0] if self.drivers else None
+        print(f"✅ Oturum havuzu hazır: {len(self.drivers)} Chrome oturumu")
+    
+    def _driver_alive(self, driver):
+        """Oturumun hâlâ yanıt verip vermediğini kontrol eder"""
+        try:
+            driver.current_url
+            return True
+        except Exception:
+            return False
+    
+    def _restart_driver(self, slot):
+        """Çöken oturumu kapatıp yerine yenisini başlatır; başarısızsa None döner
+
+        self.driver kapatılan oturumu gösteriyorsa yeni oturuma, o da yoksa
+        havuzdaki başka bir canlı oturuma (hiç yoksa None) taşınır.
+        """
+        old_driver = self.drivers[slot]
+        try:
+            old_driver.quit()
+        except Exception:
+            pass
+        
+        try:
+            driver = self._create_driver()
+        except Exception as e:
+            print(f"❌ Oturum {slot + 1} yeniden başlatılamadı: {e}")
+            driver = None
+        
+        self.drivers[slot] = driver
+        if self.driver is old_driver:
+            self.driver = driver or next((other for other in self.drivers if other is not None), None)
+        return driver
+    
+    def _capture_pages(self, pages, output_dir, in_memory=False, on_captured=None):
+        """Sayfaları çeker, ekran görüntüsü yollarını sayfa sırasıyla döner
+
+        Birden fazla oturum varsa sayfalar boşta olan oturuma dağıtılır. Bir
+        oturum çökerse yeniden başlatılır ve sayfa bir kez daha denenir;
+        yeniden başlatılamazsa o sayfa (bir kez) ve kalanlar diğer oturumlarla
+        çekilir.
+        on_captured verilirse her başarılı çekimden hemen sonra
+        on_captured(page_config, screenshot_path) çağrılır.
+        """
+        if self.sessions <= 1 or len(pages) <= 1:
+            # Ana oturum daha önce yeniden başlatılamadıysa yenisi açılır
+            if self.driver is None and pages:
+                self._ensure_pool(1)
+            paths = []
+            for page_config in pages:
+                paths.append(self.capture_screenshot(page_config, self.driver, output_dir, in_memory))
+                if paths[-1] and on_captured:
+                    on_captured(page_config, paths[-1])
+            return paths
+        
+        self._ensure_pool(min(self.sessions, len(pages)))
+        
+        page_queue = queue.Queue()
+        for index, page_config in enumerate(pages):
+            page_queue.put((index, page_config))
+        paths = [None] * len(pages)
+        requeued = set()
+        
+        def session_worker(slot):
+            while self.drivers[slot] is not None:
+                try:
+                    index, page_config = page_queue.get_nowait()
+                except queue.Empty:
+                    return
+                
+                paths[index] = self.capture_screenshot(page_config, self.drivers[slot], output_dir, in_memory)
+                if paths[index] is None and not self._driver_alive(self.drivers[slot]):
+                    print(f"⚠️ Oturum {slot + 1} yanıt vermiyor, yeniden başlatılıyor...")
+                    driver = self._restart_driver(slot)
+                    if driver is not None:
+                        paths[index] = self.capture_screenshot(page_config, driver, output_dir, in_memory)
+                    elif index not in requeued:
+                        # Oturum kayboldu: sayfa bir kez kuyruğa geri konur, canlı bir oturum dener
+                        requeued.add(index)
+                        page_queue.put((index, page_config))
+                        continue
+                if paths[index] and on_captured:
+                    on_captured(page_config, paths[index])
+        
+        # Geri konan sayfaları, kuyruk boş diye çıkmış oturumlar alamamış olabilir;
+        # kuyruk boşalana ya da canlı oturum kalmayana kadar yeniden dağıt
+        while not page_queue.empty():
+            threads = [
+                threading.Thread(target=session_worker, args=(slot,))
+                for slot, driver in enumerate(self.drivers) if driver is not None
+            ]
+            if not threads:
+                break
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        
+        return paths
+    
+    def _apply_blocklist(self, driver, page_config):
+        """Suite ve sayfa engelleme desenlerini CDP ile oturuma uygular, desen listesini döner
+
+        Liste boşsa önceki sayfadan kalan engeller temizlenir.
+        """
+        blocked_urls = list(dict.fromkeys(self.blocked_urls + page_config.get('blocked_urls', [])))
+        if not self.track_network:
+            return blocked_urls
+        
+        try:
+            driver.execute_cdp_cmd('Network.enable', {})
+            driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': blocked_urls})
+        except Exception as e:
+            print(f"⚠️ URL engelleme listesi uygulanamadı: {e}")
+            return []
+        return blocked_urls
+    
+    def _apply_virtual_time(self, driver):
+        """Deterministik modda sayfa için sanal zaman bütçesini (Emulation.setVirtualTimePolicy) kurar"""
+        if not (self.deterministic and self.virtual_time_budget_ms > 0):
+            return
+        try:
+            driver.execute_cdp_cmd('Emulation.setVirtualTimePolicy', {
+                'policy': 'pauseIfNetworkFetchesPending',
+                'budget': self.virtual_time_budget_ms
+            })
+        except Exception as e:
+            print(f"⚠️ Sanal zaman politikası uygulanamadı: {e}")
+    
+    def _settle(self, driver, upper_bound, monitor=None):
+        """Sayfanın oturmasını bekler ve fiilen beklenen süreyi saniye olarak döner
+
+        Stratejiler sırayla uygulanır ve upper_bound hepsi için ortak üst
+        sınırdır. 'fixed' kalan süre kadar uyur, 'network-idle' ağ trafiği
+        durana kadar, 'stable' ardışık kareler eşleşene kadar bekler.
+        """
+        started = time.monotonic()
+        
+        for strategy in self.wait_strategies:
+            remaining = upper_bound - (time.monotonic() - started)
+            if remaining <= 0:
+                break
+            if strategy == 'stable':
+                self._wait_until_stable(driver, remaining)
+            elif strategy == 'network-idle' and monitor is not None and monitor.available:
+                self._wait_network_idle(monitor, remaining)
+            elif strategy == 'fixed' and self.deterministic:
+                # Animasyonlar donuk: sabit bekleme gereksiz
+                continue
+            else:
+                # Ağ izlenemiyorsa 'network-idle' de sabit beklemeye düşer
+                time.sleep(remaining)
+        
+        return time.monotonic() - started
+    
+    def _wait_network_idle(self, monitor, timeout):
+        """network_idle_ms boyunca en fazla network_max_inflight istek açık kalana kadar bekler"""
+        deadline = time.monotonic() + timeout
+        idle_seconds = self.network_idle_ms / 1000
+        
+        while time.monotonic() < deadline:
+            in_flight = monitor.poll()
+            if not monitor.available:
+                time.sleep(max(0.0, deadline - time.monotonic()))
+                return
+            if in_flight <= self.network_max_inflight and time.time() - monitor.last_activity >= idle_seconds:
+                return
+            time.sleep(min(self.network_poll_interval, max(0.0, deadline - time.monotonic())))
+    
+    def _wait_until_stable(self, driver, timeout):
+        """Art arda stability_frames düşük çözünürlüklü kare tolerans içinde eşleşene kadar bekler
+
+        Deterministik modda animasyonlar donuk olduğundan ilk eşleşen iki kare yeterlidir.
+        """
+        deadline = time.monotonic() + timeout
+        required_frames = 2 if self.deterministic else self.stability_frames
+        previous = None
+        matching = 1
+        
+        while True:
+            frame = self._stability_frame(driver)
+            if frame is not None and previous is not None and frame.shape == previous.shape:
+                changed = np.count_nonzero(cv2.absdiff(frame, previous) > self.stability_pixel_tolerance)
+                matching = matching + 1 if changed <= self.stability_tolerance * frame.size else 1
+                if matching >= required_frames:
+                    return
+            else:
+                matching = 1
+            previous = frame
+            
+            if time.monotonic() + self.stability_interval > deadline:
+                time.sleep(max(0.0, deadline - time.monotonic()))
+                return
+            time.sleep(self.stability_interval)
+    
+    def _stability_frame(self, driver):
+        """Görünür alanın küçültülmüş gri kopyasını bellekte alır; alınamazsa None"""
+        try:
+            # CDP ile tarayıcı tarafında küçültülmüş JPEG; diske yazılmaz
+            width, height = driver.execute_script("return [window.innerWidth, window.innerHeight]")
+            data = driver.execute_cdp_cmd('Page.captureScreenshot', {
+                'format': 'jpeg',
+                'quality': 50,
+                'clip': {'x': 0, 'y': 0, 'width': width, 'height': height, 'scale': self.stability_scale}
+            })['data']
+            png = base64.b64decode(data)
+            flags = cv2.IMREAD_GRAYSCALE
+        except Exception:
+            try:
+                png = driver.get_screenshot_as_png()
+                flags = cv2.IMREAD_REDUCED_GRAYSCALE_4
+            except Exception:
+                return None
+        return cv2.imdecode(np.frombuffer(png, dtype=np.uint8), flags)
+    
+    def capture_screenshot(self, page_config, driver=None, output_dir=None, in_memory=False):
+        """Belirtilen sayfanın ekran görüntüsünü alır
+
+        driver ve output_dir verilmezse ana oturum ve screenshots_dir kullanılır.
+        in_memory=True ise PNG baytları captured_images'a konur; dosya varsa
+        screenshot_writer tarafından arka planda yazılır.
+        """
+        driver = driver or self.driver
+        output_dir = output_dir or self.screenshots_dir
         page_name = page_config['name']
         url = page_config['url']
         wait_time = page_config.get('wait_time', 5)  # Daha uzun bekleme
         
+        waited = 0.0
+        
         print(f"📸 {page_name} sayfasının ekran görüntüsü alınıyor...")
         print(f"🌐 URL: {url}")
         
         try:
+            # Engelleme listesi her gezinmeden önce bu sayfa için yeniden kurulur
+            blocked_urls = self._apply_blocklist(driver, page_config)
+            
+            # Sanal zaman: sayfa zamanlayıcıları bütçe kadar beklemeden ileri sarılır
+            self._apply_virtual_time(driver)
+            
+            # Ağ izleyicisi sayfaya gitmeden önce kurulur, önceki sayfanın olayları atılır
+            monitor = NetworkMonitor(driver) if self.track_network else None
+            
             # Sayfaya git
-            self.driver.get(url)
+            driver.get(url)
             
             # Google için özel bekleme
             if 'google' in page_name.lower():
@@ -86,39 +734,40 @@ class ScreenshotCapture:
             from selenium.webdriver.common.by import By
             
             # Sayfa yüklenmesini bekle
-            WebDriverWait(self.driver, 20).until(
+            WebDriverWait(driver, 20).until(
                 EC.presence_of_element_located((By.TAG_NAME, "body"))
             )
             
             # JavaScript'in çalışmasını bekle
-            WebDriverWait(self.driver, 20).until(
+            WebDriverWait(driver, 20).until(
                 lambda driver: driver.execute_script("return document.readyState") == "complete"
             )
             
-            # Sayfanın yüklenmesini bekle
-            time.sleep(wait_time)
+            # Sayfanın oturmasını bekle (wait_time üst sınır)
+            waited += self._settle(driver, wait_time, monitor)
             
-            # Google için ek kontrol
-            if 'google' in page_name.lower():
+            # Google için ek kontrol (inject kaydı olan sayfalarda betikler
+            # belge oluşturulurken zaten çalıştı; yükleme sonrası işlem gerekmez)
+            if 'google' in page_name.lower() and not page_config.get('inject'):
                 # Google logosunun yüklenip yüklenmediğini kontrol et
                 try:
-                    logo = self.driver.find_element(By.ID, "hplogo")
+                    logo = driver.find_element(By.ID, "hplogo")
                     if logo.is_displayed():
                         print("✅ Google logosu yüklendi")
                     else:
                         print("⚠️ Google logosu görünmüyor, ek bekleme...")
-                        time.sleep(3)
+                        waited += self._settle(driver, 3, monitor)
                 except:
                     print("⚠️ Google logosu bulunamadı, ek bekleme...")
-                    time.sleep(3)
+                    waited += self._settle(driver, 3, monitor)
                 
                 # Gemini pop-up'ını kapat
                 try:
                     # Pop-up'ın yüklenmesini bekle
-                    time.sleep(3)
+                    waited += self._settle(driver, 3, monitor)
                     
                     # Daha kapsamlı pop-up kapatma
-                    self.driver.execute_script("""
+                    driver.execute_script("""
                         // Tüm pop-up'ları bul ve kapat
                         const selectors = [
                             '[role="dialog"]',
@@ -151,7 +800,7 @@ class ScreenshotCapture:
                         document.dispatchEvent(new KeyboardEvent('keydown', {key: 'Escape', keyCode: 27}));
                     """)
                     print("✅ Pop-up kapatma işlemi tamamlandı")
-                    time.sleep(1)
+                    waited += self._settle(driver, 1, monitor)
                         
                 except Exception as e:
                     print(f"⚠️ Pop-up kapatma hatası: {e}")
@@ -159,7 +808,7 @@ class ScreenshotCapture:
                 # Google için tema tutarlılığı sağla
                 if "google" in page_config['url'].lower():
                     try:
-                        self.driver.execute_script("""
+                        driver.execute_script("""
                             // Google'da tema tutarlılığı sağla
                             console.log('Google tema kontrolü başlatılıyor...');
                             
@@ -239,52 +888,243 @@ class ScreenshotCapture:
                             console.log('Google tema kontrolü tamamlandı');
                         """)
                         print("✅ Google tema tutarlılığı sağlandı")
-                        time.sleep(3)  # Daha uzun bekleme
+                        waited += self._settle(driver, 3, monitor)  # Daha uzun bekleme
                     except Exception as e:
                         print(f"⚠️ Google tema kontrolü hatası: {e}")
             
             # Ekran görüntüsü al
-            screenshot_path = f"{self.screenshots_dir}/{page_name}.png"
-            self.driver.save_screenshot(screenshot_path)
+            screenshot_path = f"{output_dir}/{page_name}.png"
+            stitched_height = None
+            if page_config.get('full_page', self.full_page_enabled):
+                stitched_height = self._capture_full_page(driver, screenshot_path, in_memory)
+            elif in_memory:
+                self._store_png(screenshot_path, driver.get_screenshot_as_png(), in_memory)
+            else:
+                driver.save_screenshot(screenshot_path)
             
-            print(f"✅ Ekran görüntüsü kaydedildi: {screenshot_path}")
+            # Öğe kapsamında elements listesindeki öğeler ayrıca çekilir
+            if self._scope(page_config) != 'page':
+                self._capture_elements(driver, page_config, output_dir, in_memory)
+            
+            self.page_metrics[page_name] = {
+                'wait_strategy': self.wait_strategy,
+                'waited_seconds': round(waited, 2)
+            }
+            if monitor is not None and monitor.available:
+                monitor.poll()
+                self.page_metrics[page_name]['network_requests'] = monitor.total_requests
+                if blocked_urls:
+                    self.page_metrics[page_name]['blocked_requests'] = monitor.blocked_requests
+                    print(f"🚫 {page_name}: {monitor.blocked_requests} istek engellendi")
+            if stitched_height is not None:
+                self.page_metrics[page_name]['stitched_height'] = stitched_height
+            print(f"✅ Ekran görüntüsü kaydedildi: {screenshot_path} ({waited:.1f} sn beklendi)")
             return screenshot_path
             
         except Exception as e:
             print(f"❌ Ekran görüntüsü alma hatası: {e}")
             return None
     
-    def capture_baseline_screenshots(self):
-        """Tüm test sayfalarının referans ekran görüntülerini alır"""
+    # position: fixed/sticky öğeleri gizler; ilk dilimden sonra tekrar görünmesinler diye
+    HIDE_STICKY_SCRIPT = """
+        const hidden = [];
+        document.querySelectorAll('body *').forEach(el => {
+            const position = getComputedStyle(el).position;
+            if (position === 'fixed' || position === 'sticky') {
+                hidden.push([el, el.style.visibility]);
+                el.style.visibility = 'hidden';
+            }
+        });
+        window.__uiSentinelHidden = hidden;
+        return hidden.length;
+    """
+    RESTORE_STICKY_SCRIPT = """
+        (window.__uiSentinelHidden || []).forEach(([el, visibility]) => { el.style.visibility = visibility; });
+        window.__uiSentinelHidden = [];
+    """
+    
+    def _capture_full_page(self, driver, screenshot_path, in_memory):
+        """Belgeyi kaydırarak tam sayfa görüntüsü alır ve dikilmiş yüksekliği (piksel) döner
+
+        Dilimler listede biriktirilmez; her dilim doğrudan önceden ayrılmış,
+        geçici dosya destekli bir np.memmap'e yazılır. Yükseklik
+        full_page_max_height ile sınırlıdır.
+        """
+        document_height, viewport_height = driver.execute_script(
+            "return [Math.max(document.documentElement.scrollHeight, document.body ? document.body.scrollHeight : 0),"
+            " window.innerHeight]"
+        )
+        
+        driver.execute_script("window.scrollTo(0, 0)")
+        first = cv2.imdecode(np.frombuffer(driver.get_screenshot_as_png(), dtype=np.uint8), cv2.IMREAD_COLOR)
+        slice_height, width = first.shape[:2]
+        
+        # Ekran görüntüsü pikselleri CSS pikselinden farklı olabilir (device pixel ratio)
+        scale = slice_height / viewport_height
+        total_height = min(int(round(document_height * scale)), self.full_page_max_height)
+        if total_height <= slice_height:
+            self._store_png(screenshot_path, cv2.imencode('.png', first[:total_height])[1].tobytes(), in_memory)
+            return total_height
+        
+        with tempfile.TemporaryFile() as backing:
+            stitched = np.memmap(backing, dtype=np.uint8, mode='w+', shape=(total_height, width, 3))
+            stitched[:slice_height] = first
+            del first
+            
+            hidden = 0
+            try:
+                if self.full_page_hide_sticky:
+                    hidden = driver.execute_script(self.HIDE_STICKY_SCRIPT)
+                
+                filled = slice_height
+                while filled < total_height:
+                    driver.execute_script(f"window.scrollTo(0, {filled / scale})")
+                    time.sleep(self.full_page_scroll_delay)
+                    # Son dilimde tarayıcı kaydırmayı sınırlar; gerçek konuma göre yerleştir
+                    offset = int(round(driver.execute_script("return window.scrollY") * scale))
+                    frame = cv2.imdecode(np.frombuffer(driver.get_screenshot_as_png(), dtype=np.uint8), cv2.IMREAD_COLOR)
+                    
+                    skip = filled - offset
+                    if skip < 0 or skip >= frame.shape[0]:
+                        print(f"⚠️ Sayfa beklenen yüksekliğe kaydırılamadı, {filled} pikselde kesildi")
+                        total_height = filled
+                        break
+                    rows = min(frame.shape[0] - skip, total_height - filled)
+                    stitched[filled:filled + rows] = frame[skip:skip + rows, :width]
+                    filled += rows
+            finally:
+                if hidden:
+                    driver.execute_script(self.RESTORE_STICKY_SCRIPT)
+                driver.execute_script("window.scrollTo(0, 0)")
+            
+            self._store_png(screenshot_path, cv2.imencode('.png', stitched[:total_height])[1].tobytes(), in_memory)
+            del stitched
+        
+        print(f"🧵 Tam sayfa görüntüsü dikildi: {width}x{total_height}")
+        return total_height
+    
+    def _scope(self, page_config):
+        """Sayfanın karşılaştırma kapsamını döner: 'page', 'elements' veya 'both'"""
+        return page_config.get('scope', self.config.get('capture_settings', {}).get('scope', 'page'))
+    
+    def _element_files(self, page_config, output_dir):
+        """Seçicisi tanımlı öğelerin (öğe adı, dosya yolu) çiftlerini döner"""
+        selectors = page_config.get('element_selectors', {})
+        return [
+            (element_name, f"{output_dir}/{page_config['name']}__{element_name}.png")
+            for element_name in page_config.get('elements', [])
+            if selectors.get(element_name)
+        ]
+    
+    def _store_png(self, path, png, in_memory):
+        """PNG baytlarını bellek modunda captured_images'a, değilse doğrudan diske yazar"""
+        if in_memory:
+            self.captured_images[path] = png
+            if self.screenshot_writer:
+                self.screenshot_writer.submit_bytes(path, png)
+        else:
+            with open(path, 'wb') as f:
+                f.write(png)
+    
+    def _capture_elements(self, driver, page_config, output_dir, in_memory):
+        """elements listesindeki her öğenin ekran görüntüsünü element_selectors ile ayrı ayrı alır"""
+        selectors = page_config.get('element_selectors', {})
+        element_paths = {}
+        
+        for element_name, element_path in self._element_files(page_config, output_dir):
+            try:
+                element = driver.find_element(By.CSS_SELECTOR, selectors[element_name])
+                self._store_png(element_path, element.screenshot_as_png, in_memory)
+                element_paths[element_name] = element_path
+            except Exception as e:
+                print(f"⚠️ {page_config['name']} / {element_name} öğesi alınamadı: {e}")
+        
+        missing = [name for name in page_config.get('elements', []) if not selectors.get(name)]
+        if missing:
+            print(f"⚠️ {page_config['name']}: seçicisi tanımlı olmayan öğeler atlandı: {', '.join(missing)}")
+        
+        self.element_paths[page_config['name']] = element_paths
+        print(f"🧩 {page_config['name']}: {len(element_paths)} öğe ekran görüntüsü alındı")
+    
+    def capture_baseline_screenshots(self, policy='always'):
+        """Tüm test sayfalarının referans ekran görüntülerini alır
+
+        policy: 'always' (her sayfa yeniden alınır), 'if-missing' (sadece referansı
+        olmayanlar) veya 'max-age=<süre>' (eksik ya da süreden eski olanlar;
+        ör. max-age=7d, 12h, 30m). capture_settings.baseline_policy sadece tam
+        test sürecinde uygulanır; referans yenileme komutları her zaman yeniden alır.
+        """
         print("🎯 Referans ekran görüntüleri alınıyor...")
         
+        mode, max_age = parse_baseline_policy(policy)
+        
+        # Kayıt modunda yanıtlar sadece referans çekimi sırasında arşivlenir;
+        # atlanan sayfa arşive girmez ve test çekimi 404 alırdı
+        if self.replay_mode == 'record' and mode != 'always':
+            print(f"📼 Kayıt modu: referans politikası '{policy}' yerine 'always' uygulanıyor")
+            policy, mode, max_age = 'always', 'always', None
+        
         # Baseline klasörünü oluştur
         baseline_dir = "baseline"
         os.makedirs(baseline_dir, exist_ok=True)
         
-        # screenshots_dir'i geçici olarak baseline olarak ayarla
-        original_screenshots_dir = self.screenshots_dir
-        self.screenshots_dir = baseline_dir
-        
         results = []
+        pages_to_capture = []
         
         for page_config in self.config.get('test_pages', []):
-            screenshot_path = self.capture_screenshot(page_config)
+            # Geçerli bir referans varsa yeniden alma
+            baseline_path = f"{baseline_dir}/{page_config['name']}.png"
+            required_paths = [baseline_path]
+            if self._scope(page_config) != 'page':
+                required_paths += [path for _, path in self._element_files(page_config, baseline_dir)]
+            if not any(self._baseline_needs_capture(path, mode, max_age) for path in required_paths):
+                print(f"⏭️ {page_config['name']}: mevcut referans kullanılıyor ({policy})")
+                results.append({
+                    'page_name': page_config['name'],
+                    'screenshot_path': baseline_path,
+                    'url': page_config['url'],
+                    'skipped': True
+                })
+            else:
+                pages_to_capture.append(page_config)
+        
+        # Kayıt modunda referans çekimi sırasındaki tüm yanıtlar arşive yazılır
+        if self.replay_mode == 'record':
+            self.replay_proxy.mode = 'record'
+        try:
+            screenshot_paths = self._capture_pages(pages_to_capture, baseline_dir)
+        finally:
+            if self.replay_mode == 'record':
+                self.replay_proxy.mode = 'replay'
+                self.replay_proxy.save()
+        for page_config, screenshot_path in zip(pages_to_capture, screenshot_paths):
             if screenshot_path:
                 results.append({
                     'page_name': page_config['name'],
                     'screenshot_path': screenshot_path,
-                    'url': page_config['url']
+                    'url': page_config['url'],
+                    'element_paths': self.element_paths.get(page_config['name'], {}),
+                    'metrics': self.page_metrics.get(page_config['name'], {})
                 })
         
-        # screenshots_dir'i geri al
-        self.screenshots_dir = original_screenshots_dir
-        
-        print(f"✅ {len(results)} adet referans ekran görüntüsü alındı")
+        captured_count = sum(1 for result in results if not result.get('skipped'))
+        print(f"✅ {captured_count} adet referans ekran görüntüsü alındı")
         return results
     
-    def capture_test_screenshots(self):
-        """Test sırasında ekran görüntüleri alır"""
+    def _baseline_needs_capture(self, baseline_path, mode, max_age):
+        """Referansın politikaya göre yeniden alınması gerekip gerekmediğini döner"""
+        if mode == 'always' or not os.path.exists(baseline_path):
+            return True
+        if mode == 'max-age':
+            return time.time() - os.path.getmtime(baseline_path) > max_age
+        return False
+    
+    def capture_test_screenshots(self, on_captured=None):
+        """Test sırasında ekran görüntüleri alır
+
+        on_captured(page_config, screenshot_path) her sayfa çekilir çekilmez
+        çağrılır; karşılaştırmanın çekimle üst üste binmesi için kullanılır.
+        """
         print("🧪 Test ekran görüntüleri alınıyor...")
         
         # Screenshots klasörünü oluştur
@@ -293,24 +1133,59 @@ class ScreenshotCapture:
         self.screenshots_dir = screenshots_dir # screenshots_dir'i sınıf değişkenine ata
         
         results = []
+        self.captured_images = {}
+        self.element_paths = {}
         
-        for page_config in self.config.get('test_pages', []):
-            screenshot_path = self.capture_screenshot(page_config)
+        # Boş arşivden sunulan her istek 404 alır; her sayfa yanlışlıkla FAIL olurdu
+        if self.replay_proxy and not self.replay_proxy.entry_count:
+            print(f"❌ Kayıt arşivi boş: {self.replay_proxy.archive_dir} (önce replay.mode 'record' ile referans alın)")
+            return results
+        
+        pages = self.config.get('test_pages', [])
+        screenshot_paths = self._capture_pages(pages, screenshots_dir, self.in_memory, on_captured)
+        for page_config, screenshot_path in zip(pages, screenshot_paths):
             if screenshot_path:
                 results.append({
                     'page_name': page_config['name'],
                     'screenshot_path': screenshot_path,
-                    'url': page_config['url']
+                    'url': page_config['url'],
+                    'element_paths': self.element_paths.get(page_config['name'], {}),
+                    'metrics': self.page_metrics.get(page_config['name'], {})
                 })
         
         print(f"✅ {len(results)} adet test ekran görüntüsü alındı")
         return results
     
+    def flush_writes(self):
+        """Arka planda yazılan ekran görüntüleri diske inene kadar bekler"""
+        if self.screenshot_writer:
+            self.screenshot_writer.flush()
+    
     def close_driver(self):
-        """WebDriver'ı kapatır"""
-        if self.driver:
-            self.driver.quit()
-            print("🔒 WebDriver kapatıldı")
+        """WebDriver'ı ve havuzdaki tüm oturumları kapatır"""
+        if self.screenshot_writer:
+            self.screenshot_writer.close()
+            self.screenshot_writer = None
+        
+        drivers = [driver for driver in self.drivers if driver is not None]
+        if self.driver and self.driver not in drivers:
+            drivers.append(self.driver)
+        
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception as e:
+                print(f"⚠️ WebDriver kapatma hatası: {e}")
+        
+        if drivers:
+            print(f"🔒 WebDriver kapatıldı ({len(drivers)} oturum)")
+        self.drivers = []
+        self.driver = None
+        
+        if self.replay_proxy:
+            self.replay_proxy.stop()
+            print(f"📼 Proxy: {self.replay_proxy.hits} yanıt arşivden sunuldu, {self.replay_proxy.misses} istek arşivde yoktu")
+            self.replay_proxy = None
 
 
 def main():
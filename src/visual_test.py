@@ -1,6 +1,8 @@
 import os
 import sys
 import json
+import queue
+import threading
 from datetime import datetime
 from screenshot_capture import ScreenshotCapture
 from image_comparison import ImageComparison
@@ -8,9 +10,12 @@ from report_generator import ReportGenerator
 
 
 class VisualTest:
-    def __init__(self, config_file="config/test_config.json"):
+    def __init__(self, config_file="config/test_config.json", workers=None, baseline_policy=None, pipeline=None):
         """VisualTest sınıfını başlatır"""
         self.config_file = config_file
+        self.workers = workers
+        self.baseline_policy = baseline_policy
+        self.pipeline = pipeline
         self.screenshot_capture = None
         self.image_comparison = None
         self.report_generator = None
@@ -25,6 +30,10 @@ class VisualTest:
             self.image_comparison = ImageComparison(self.config_file)
             self.report_generator = ReportGenerator(self.config_file)
             
+            # Çekim ve karşılaştırma üst üste binsin mi (config, CLI ile ezilebilir)
+            if self.pipeline is None:
+                self.pipeline = self.screenshot_capture.config.get('capture_settings', {}).get('pipeline', False)
+            
             print("✅ Test ortamı başarıyla hazırlandı")
             return True
             
@@ -32,15 +41,18 @@ class VisualTest:
             print(f"❌ Test ortamı hazırlama hatası: {e}")
             return False
     
-    def capture_baseline(self):
+    def capture_baseline(self, policy='always'):
         """Referans ekran görüntülerini alır"""
         print("\n🎯 Referans Ekran Görüntüleri Alınıyor...")
         
         try:
-            results = self.screenshot_capture.capture_baseline_screenshots()
+            results = self.screenshot_capture.capture_baseline_screenshots(policy)
             
             if results:
-                print(f"✅ {len(results)} adet referans görüntü alındı")
+                skipped_count = sum(1 for result in results if result.get('skipped'))
+                print(f"✅ {len(results) - skipped_count} adet referans görüntü alındı")
+                if skipped_count:
+                    print(f"⏭️ {skipped_count} adet mevcut referans görüntü kullanıldı")
                 return True
             else:
                 print("❌ Referans görüntü alınamadı")
@@ -57,6 +69,10 @@ class VisualTest:
         try:
             results = self.screenshot_capture.capture_test_screenshots()
             
+            # Bellek modunda karşılaştırma dosyaları değil baytları kullanır
+            if self.screenshot_capture.captured_images:
+                self.image_comparison.set_test_images(self.screenshot_capture.captured_images)
+            
             if results:
                 print(f"✅ {len(results)} adet test görüntü alındı")
                 return True
@@ -68,12 +84,12 @@ class VisualTest:
             print(f"❌ Test görüntü alma hatası: {e}")
             return False
     
-    def compare_images(self):
+    def compare_images(self, ready_pages=None):
         """Görsel karşılaştırma yapar"""
         print("\n🔍 Görsel Karşılaştırma Başlatılıyor...")
         
         try:
-            comparison_results = self.image_comparison.compare_all_pages()
+            comparison_results = self.image_comparison.compare_all_pages(workers=self.workers, ready_pages=ready_pages)
             
             if comparison_results:
                 print("✅ Görsel karşılaştırma tamamlandı")
@@ -86,6 +102,46 @@ class VisualTest:
             print(f"❌ Görsel karşılaştırma hatası: {e}")
             return None
     
+    def capture_and_compare(self):
+        """Test görüntülerini alırken çekimi biten sayfaları hemen karşılaştırır
+
+        Çekim ayrı bir thread'de çalışır ve her sayfayı bir kuyruğa bırakır;
+        karşılaştırma bu kuyruktan beslenir. Özet sıralı moddakiyle aynıdır.
+        """
+        print("\n🧪 Test Ekran Görüntüleri Alınıyor (karşılaştırma eş zamanlı)...")
+        
+        ready = queue.Queue()
+        captured = []
+        
+        def on_captured(page_config, screenshot_path):
+            # Bellek modunda karşılaştırma dosyayı değil baytları kullanır
+            element_paths = self.screenshot_capture.element_paths.get(page_config['name'], {})
+            for path in [screenshot_path] + list(element_paths.values()):
+                data = self.screenshot_capture.captured_images.get(path)
+                if data is not None:
+                    self.image_comparison.add_test_image(path, data)
+            ready.put(page_config['name'])
+        
+        def capture():
+            try:
+                captured.extend(self.screenshot_capture.capture_test_screenshots(on_captured))
+            except Exception as e:
+                print(f"❌ Test görüntü alma hatası: {e}")
+            finally:
+                ready.put(None)
+        
+        capture_thread = threading.Thread(target=capture, daemon=True)
+        capture_thread.start()
+        comparison_results = self.compare_images(ready_pages=iter(ready.get, None))
+        capture_thread.join()
+        
+        if not captured:
+            print("❌ Test görüntü alınamadı")
+            return None
+        
+        print(f"✅ {len(captured)} adet test görüntü alındı")
+        return comparison_results
+    
     def generate_reports(self, comparison_results):
         """Raporları oluşturur"""
         print("\n📊 Raporlar Oluşturuluyor...")
@@ -114,20 +170,30 @@ class VisualTest:
             return False
         
         try:
-            # 1. Referans görüntüleri al
-            if not self.capture_baseline():
+            # 1. Referans görüntüleri al (geçerli referanslar config politikasına
+            # göre yeniden alınmaz; --baseline-policy ile ezilebilir)
+            policy = self.baseline_policy or self.screenshot_capture.config.get(
+                'capture_settings', {}).get('baseline_policy', 'always')
+            if not self.capture_baseline(policy):
                 return False
             
-            # 2. Test görüntüleri al
-            if not self.capture_test_screenshots():
-                return False
-            
-            # 3. Görsel karşılaştırma yap
-            comparison_results = self.compare_images()
-            if not comparison_results:
-                return False
+            if self.pipeline:
+                # 2-3. Test görüntülerini al ve hazır olanları hemen karşılaştır
+                comparison_results = self.capture_and_compare()
+                if not comparison_results:
+                    return False
+            else:
+                # 2. Test görüntüleri al
+                if not self.capture_test_screenshots():
+                    return False
+                
+                # 3. Görsel karşılaştırma yap
+                comparison_results = self.compare_images()
+                if not comparison_results:
+                    return False
             
-            # 4. Raporları oluştur
+            # 4. Raporları oluştur (rapor test görüntülerini diskten okur)
+            self.screenshot_capture.flush_writes()
             reports = self.generate_reports(comparison_results)
             if not reports:
                 return False
@@ -179,7 +245,8 @@ class VisualTest:
             return False
         
         try:
-            success = self.capture_baseline()
+            # Referans modu açıkça yenileme içindir; politika sadece CLI ile verilir
+            success = self.capture_baseline(self.baseline_policy or 'always')
             if success:
                 print("✅ Referans görüntüleri başarıyla alındı")
             return success
@@ -229,11 +296,20 @@ def main():
                        default='full', help='Test modu')
     parser.add_argument('--config', default='config/test_config.json', 
                        help='Konfigürasyon dosyası')
+    parser.add_argument('--workers', type=int, default=None,
+                       help='Karşılaştırma için paralel işlemci sayısı (0 = CPU sayısı)')
+    parser.add_argument('--baseline-policy', default=None,
+                       help='Referans alma politikası: always, if-missing veya max-age=<süre> (ör. 7d)')
+    parser.add_argument('--pipeline', dest='pipeline', action='store_true', default=None,
+                       help='Test görüntüsü alınırken hazır sayfaları hemen karşılaştır')
+    parser.add_argument('--no-pipeline', dest='pipeline', action='store_false',
+                       help='Önce tüm görüntüleri al, sonra karşılaştır')
     
     args = parser.parse_args()
     
     # VisualTest'i başlat
-    visual_test = VisualTest(args.config)
+    visual_test = VisualTest(args.config, workers=args.workers, baseline_policy=args.baseline_policy,
+                             pipeline=args.pipeline)
     
     try:
         if args.mode == 'full':
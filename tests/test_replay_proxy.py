@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+UI Sentinel - Kayıt/Tekrar Proxy Testleri
+Bu dosya, yerel bir HTTP sunucusu üzerinden kayıt ve tekrar akışını test eder.
+"""
+
+import pytest
+import os
+import sys
+import threading
+import http.client
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# src klasörünü Python path'ine ekle
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from replay_proxy import ReplayProxy
+
+
+class OriginHandler(BaseHTTPRequestHandler):
+    """İstek yolunu ve gövdesini yanıt olarak döndüren kaynak sunucu"""
+    requests = []
+
+    def log_message(self, format, *args):
+        pass
+
+    def _respond(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        self.requests.append((self.command, self.path))
+        data = f"{self.command} {self.path} {body.decode()}".encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST = _respond
+
+
+def proxy_request(proxy, method, url, body=None):
+    """İsteği proxy üzerinden gönderir, (durum, başlıklar, gövde) döner"""
+    connection = http.client.HTTPConnection(proxy.host, proxy.port, timeout=10)
+    try:
+        connection.request(method, url, body=body)
+        response = connection.getresponse()
+        return response.status, dict(response.getheaders()), response.read()
+    finally:
+        connection.close()
+
+
+class TestReplayProxy:
+    """Kayıt/tekrar proxy testleri"""
+
+    @pytest.fixture
+    def origin(self):
+        """Rastgele portta çalışan yerel kaynak sunucu"""
+        OriginHandler.requests = []
+        server = ThreadingHTTPServer(('127.0.0.1', 0), OriginHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+        server.shutdown()
+        server.server_close()
+
+    def test_record_then_replay(self, origin, tmp_path):
+        """Kaydedilen yanıtların kaynak sunucuya gitmeden tekrar sunulduğu test"""
+        archive_dir = str(tmp_path / 'archive')
+
+        recorder = ReplayProxy(archive_dir, 'record')
+        recorder.start()
+        try:
+            page = proxy_request(recorder, 'GET', f"{origin}/sayfa?t=1")
+            form = proxy_request(recorder, 'POST', f"{origin}/form", body=b'a=1')
+        finally:
+            recorder.stop()
+
+        assert page[0] == 200 and page[2] == b'GET /sayfa?t=1 '
+        assert form[2] == b'POST /form a=1'
+        assert recorder.entry_count == 2
+        assert os.path.exists(os.path.join(archive_dir, 'index.json'))
+        origin_requests = len(OriginHandler.requests)
+
+        replayer = ReplayProxy(archive_dir, 'replay')
+        replayer.start()
+        try:
+            replayed = proxy_request(replayer, 'GET', f"{origin}/sayfa?t=1")
+            # Sorgu dizesi değişen istek yedek anahtardan sunulur
+            loose = proxy_request(replayer, 'GET', f"{origin}/sayfa?t=2")
+            replayed_form = proxy_request(replayer, 'POST', f"{origin}/form", body=b'a=1')
+            missing = proxy_request(replayer, 'GET', f"{origin}/yok")
+        finally:
+            replayer.stop()
+
+        # Sonuçları kontrol et
+        assert replayed[0] == 200
+        assert replayed[2] == page[2]
+        assert replayed[1]['Content-Type'] == 'text/plain'
+        assert loose[2] == page[2]
+        assert replayed_form[2] == form[2]
+        assert missing[0] == 404
+        assert missing[1]['X-UI-Sentinel-Replay'] == 'miss'
+        assert (replayer.hits, replayer.misses) == (3, 1)
+        assert len(OriginHandler.requests) == origin_requests
+
+    def test_empty_archive(self, tmp_path):
+        """Boş arşivde kayıt sayısının sıfır olduğu test"""
+        proxy = ReplayProxy(str(tmp_path / 'archive'), 'replay')
+        assert proxy.entry_count == 0
+        assert proxy.lookup('GET', 'http://example.com/', b'') is None
+        assert proxy.misses == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
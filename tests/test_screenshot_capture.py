@@ -0,0 +1,527 @@
+#!/usr/bin/env python3
+"""
+UI Sentinel - Ekran Görüntüsü Alma Testleri
+Bu dosya, tarayıcı gerektirmeyen çekim yardımcılarını test eder.
+"""
+
+import pytest
+import os
+import re
+import sys
+import json
+import time
+import shutil
+import subprocess
+import threading
+import cv2
+import numpy as np
+
+# src klasörünü Python path'ine ekle
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'config', 'test_config.json')
+
+import screenshot_capture as screenshot_capture_module
+import webdriver_manager.chrome
+import selenium.webdriver
+from screenshot_capture import ScreenshotCapture, NetworkMonitor, parse_baseline_policy
+
+
+class FakeDriver:
+    """Tarayıcı olmadan oturum davranışını taklit eden sahte WebDriver"""
+
+    def __init__(self):
+        self.closed = False
+
+    def quit(self):
+        self.closed = True
+
+
+class SessionDriver(FakeDriver):
+    """Çekim dağıtıcısı testleri için; crash=True ise ilk çekimde çöker"""
+
+    def __init__(self, crash=False):
+        super().__init__()
+        self.crash = crash
+        self.alive = True
+        self.pages = []
+
+    @property
+    def current_url(self):
+        if not self.alive:
+            raise RuntimeError('oturum kapandı')
+        return 'about:blank'
+
+
+class ChromeDriver(FakeDriver):
+    """webdriver.Chrome yerine geçen, seçenekleri ve CDP komutlarını kaydeden sahte oturum"""
+    instances = []
+
+    def __init__(self, service=None, options=None):
+        super().__init__()
+        self.options = options
+        self.cdp_commands = []
+        ChromeDriver.instances.append(self)
+
+    def execute_cdp_cmd(self, command, params):
+        self.cdp_commands.append((command, params))
+        return {}
+
+
+class FramesDriver(FakeDriver):
+    """Her ekran görüntüsünde sıradaki kareyi döndüren sahte WebDriver; CDP desteklemez"""
+
+    def __init__(self, frames):
+        super().__init__()
+        self.frames = frames
+        self.shots = 0
+
+    def execute_script(self, script):
+        raise RuntimeError('CDP yok')
+
+    def get_screenshot_as_png(self):
+        frame = self.frames[min(self.shots, len(self.frames) - 1)]
+        self.shots += 1
+        return cv2.imencode('.png', frame)[1].tobytes()
+
+
+class LogDriver(FakeDriver):
+    """get_log('performance') çağrılarında sıradaki olay grubunu döndüren sahte WebDriver"""
+
+    def __init__(self, batches):
+        super().__init__()
+        self.batches = list(batches)
+
+    def get_log(self, log_type):
+        return self.batches.pop(0) if self.batches else []
+
+
+class ScrollingDriver(FakeDriver):
+    """Uzun bir sayfayı device pixel ratio ile kaydırıp görünür dilimi döndüren sahte WebDriver"""
+
+    def __init__(self, page, viewport_height, pixel_ratio):
+        super().__init__()
+        self.page = page
+        self.viewport_height = viewport_height
+        self.pixel_ratio = pixel_ratio
+        self.document_height = page.shape[0] // pixel_ratio
+        self.scroll_y = 0
+
+    def execute_script(self, script):
+        if script.startswith('return [Math.max'):
+            return [self.document_height, self.viewport_height]
+        if script == 'return window.scrollY':
+            return self.scroll_y
+        match = re.match(r'window\.scrollTo\(0, ([\d.]+)\)', script)
+        if match:
+            # Tarayıcı gibi en alt kaydırma konumunda sınırla
+            self.scroll_y = min(float(match.group(1)), self.document_height - self.viewport_height)
+            return None
+        return 0
+
+    def get_screenshot_as_png(self):
+        top = int(self.scroll_y * self.pixel_ratio)
+        return cv2.imencode('.png', self.page[top:top + self.viewport_height * self.pixel_ratio])[1].tobytes()
+
+
+def network_event(method, request_id, timestamp, **params):
+    """Chrome performans logu biçiminde tek bir ağ olayı üretir"""
+    message = {'message': {'method': method, 'params': dict(params, requestId=request_id)}}
+    return {'message': json.dumps(message), 'timestamp': timestamp * 1000}
+
+
+def run_inject_source(source, hostname, ready_state='loading'):
+    """Enjeksiyon betiğini node ile sahte location/document üzerinde çalıştırır
+
+    (yükleme sırasında çalışan betik sayısı, DOMContentLoaded sonrası sayı) döner.
+    """
+    harness = f"""
+        globalThis.calls = [];
+        const listeners = {{}};
+        globalThis.location = {{hostname: {json.dumps(hostname)}}};
+        globalThis.document = {{
+            readyState: {json.dumps(ready_state)},
+            addEventListener: (name, listener) => {{ listeners[name] = listener; }}
+        }};
+        {source}
+        const before = calls.length;
+        if (listeners.DOMContentLoaded) listeners.DOMContentLoaded();
+        console.log(JSON.stringify([before, calls.length]));
+    """
+    output = subprocess.run(['node', '-e', harness], capture_output=True, text=True, check=True, timeout=30)
+    return tuple(json.loads(output.stdout))
+
+
+class TestScreenshotCapture:
+    """Ekran görüntüsü alma testleri"""
+
+    @pytest.fixture
+    def screenshot_capture(self, tmp_path, monkeypatch):
+        """Tarayıcı başlatmadan ScreenshotCapture örneği oluşturur"""
+        monkeypatch.chdir(tmp_path)
+        monkeypatch.setattr(ScreenshotCapture, 'setup_browser', lambda self: None)
+        capture = ScreenshotCapture(CONFIG_FILE)
+        yield capture
+        capture.close_driver()
+
+    def test_parse_baseline_policy(self):
+        """Geçerli referans politikalarının çözüldüğü test"""
+        assert parse_baseline_policy('always') == ('always', None)
+        assert parse_baseline_policy(' If-Missing ') == ('if-missing', None)
+        assert parse_baseline_policy('max-age=7d') == ('max-age', 7 * 86400)
+        assert parse_baseline_policy('max-age=12h') == ('max-age', 12 * 3600)
+        assert parse_baseline_policy('max-age=30m') == ('max-age', 30 * 60)
+        assert parse_baseline_policy('max-age=90') == ('max-age', 90)
+
+    @pytest.mark.parametrize('policy', ['sometimes', 'max-age=', 'max-age=abc', 'max-age=7x', ''])
+    def test_parse_baseline_policy_invalid(self, policy):
+        """Geçersiz referans politikalarında hata verildiği test"""
+        with pytest.raises(ValueError):
+            parse_baseline_policy(policy)
+
+    def test_baseline_needs_capture(self, screenshot_capture, tmp_path):
+        """Referansın politikaya ve dosya yaşına göre yeniden alındığı test"""
+        baseline_path = str(tmp_path / 'baseline.png')
+        missing_path = str(tmp_path / 'eksik.png')
+        with open(baseline_path, 'wb') as f:
+            f.write(b'png')
+
+        # Eksik referans her politikada alınır
+        for mode, max_age in [('always', None), ('if-missing', None), ('max-age', 3600)]:
+            assert screenshot_capture._baseline_needs_capture(missing_path, mode, max_age) is True
+
+        assert screenshot_capture._baseline_needs_capture(baseline_path, 'always', None) is True
+        assert screenshot_capture._baseline_needs_capture(baseline_path, 'if-missing', None) is False
+        assert screenshot_capture._baseline_needs_capture(baseline_path, 'max-age', 3600) is False
+
+        # İki saat önce değiştirilmiş referans bir saatlik sınırı aşar
+        two_hours_ago = time.time() - 7200
+        os.utime(baseline_path, (two_hours_ago, two_hours_ago))
+        assert screenshot_capture._baseline_needs_capture(baseline_path, 'max-age', 3600) is True
+        assert screenshot_capture._baseline_needs_capture(baseline_path, 'max-age', 3 * 3600) is False
+
+    def test_restart_failure_keeps_driver_live(self, screenshot_capture, monkeypatch):
+        """Yeniden başlatılamayan oturumun ana oturum olarak kalmadığı ve havuzun yeniden doldurulduğu test"""
+        first, second = FakeDriver(), FakeDriver()
+        screenshot_capture.drivers = [first, second]
+        screenshot_capture.driver = first
+
+        def fail():
+            raise RuntimeError('chrome başlamadı')
+
+        monkeypatch.setattr(screenshot_capture, '_create_driver', fail)
+        assert screenshot_capture._restart_driver(0) is None
+        assert first.closed is True
+        assert screenshot_capture.drivers == [None, second]
+        assert screenshot_capture.driver is second
+
+        assert screenshot_capture._restart_driver(1) is None
+        assert screenshot_capture.driver is None
+
+        # Boş yuvalar sayılmaz, havuz yeniden doldurulur
+        monkeypatch.setattr(screenshot_capture, '_create_driver', FakeDriver)
+        screenshot_capture._ensure_pool(2)
+        assert len(screenshot_capture.drivers) == 2
+        assert all(isinstance(driver, FakeDriver) and not driver.closed for driver in screenshot_capture.drivers)
+        assert screenshot_capture.driver is screenshot_capture.drivers[0]
+
+    def test_capture_pages_dispatcher(self, screenshot_capture, monkeypatch):
+        """Paralel çekimde sıranın korunduğu, çöken oturumun sayfasının başka oturumda çekildiği test"""
+        pages = [{'name': f'p{number}', 'url': f'https://example.com/{number}'} for number in range(1, 7)]
+        crashing = SessionDriver(crash=True)
+        drivers = [crashing, SessionDriver(), SessionDriver()]
+        screenshot_capture.sessions = 3
+        screenshot_capture.drivers = list(drivers)
+        screenshot_capture.driver = crashing
+
+        def fake_capture(page_config, driver, output_dir, in_memory):
+            if driver.crash:
+                # Diğer oturumlar kuyruğu boşaltıp çıktıktan sonra çöker
+                time.sleep(0.2)
+                driver.alive = False
+                return None
+            driver.pages.append(page_config['name'])
+            return f"{output_dir}/{page_config['name']}.png"
+
+        def fail():
+            raise RuntimeError('chrome başlamadı')
+
+        monkeypatch.setattr(screenshot_capture, 'capture_screenshot', fake_capture)
+        monkeypatch.setattr(screenshot_capture, '_create_driver', fail)
+        captured = []
+        lock = threading.Lock()
+
+        def on_captured(page_config, path):
+            with lock:
+                captured.append(page_config['name'])
+
+        paths = screenshot_capture._capture_pages(pages, 'out', on_captured=on_captured)
+
+        # Sonuçları kontrol et
+        assert paths == [f"out/{page['name']}.png" for page in pages]
+        assert sorted(captured) == [page['name'] for page in pages]
+        assert crashing.closed is True and crashing.pages == []
+        assert sorted(drivers[1].pages + drivers[2].pages) == [page['name'] for page in pages]
+        assert screenshot_capture.drivers[0] is None
+        assert screenshot_capture.driver is drivers[1]
+
+    def test_capture_pages_requeue_once(self, screenshot_capture, monkeypatch):
+        """Tüm oturumlar çökerse sayfanın sonsuza dek kuyruğa konmadığı test"""
+        pages = [{'name': f'p{number}', 'url': f'https://example.com/{number}'} for number in range(1, 3)]
+        screenshot_capture.sessions = 2
+        screenshot_capture.drivers = [SessionDriver(crash=True), SessionDriver(crash=True)]
+
+        def crash(page_config, driver, output_dir, in_memory):
+            driver.alive = False
+            return None
+
+        def fail():
+            raise RuntimeError('chrome başlamadı')
+
+        monkeypatch.setattr(screenshot_capture, 'capture_screenshot', crash)
+        monkeypatch.setattr(screenshot_capture, '_create_driver', fail)
+
+        assert screenshot_capture._capture_pages(pages, 'out') == [None, None]
+        assert screenshot_capture.drivers == [None, None]
+
+    @pytest.mark.parametrize('headless', [False, True])
+    def test_create_driver_viewport(self, screenshot_capture, monkeypatch, headless):
+        """Görünüm alanı ve ölçeğin sadece headless modda CDP ile sabitlendiği test"""
+        ChromeDriver.instances = []
+        monkeypatch.setattr(selenium.webdriver, 'Chrome', ChromeDriver)
+        screenshot_capture.driver_path = 'chromedriver'
+        screenshot_capture.config['browser'].update({
+            'headless': headless,
+            'window_size': {'width': 1280, 'height': 800},
+            'device_scale_factor': 2
+        })
+
+        driver = screenshot_capture._create_driver()
+
+        # Sonuçları kontrol et
+        assert driver is ChromeDriver.instances[0]
+        arguments = driver.options.arguments
+        assert '--window-size=1280,800' in arguments
+        assert ('--headless=new' in arguments) is headless
+        assert ('--force-device-scale-factor=2' in arguments) is headless
+        commands = dict(driver.cdp_commands)
+        assert 'Page.addScriptToEvaluateOnNewDocument' in commands
+        if headless:
+            assert commands['Emulation.setDeviceMetricsOverride'] == {
+                'width': 1280, 'height': 800, 'deviceScaleFactor': 2, 'mobile': False
+            }
+        else:
+            assert 'Emulation.setDeviceMetricsOverride' not in commands
+
+    def test_inject_source(self, screenshot_capture):
+        """Enjeksiyon betiğinin host'a göre sınırlandığı ve DOMContentLoaded'a ertelendiği test"""
+        page = {'url': 'https://www.example.com/sayfa', 'inject': {'scripts': ['calls.push(1);']}}
+        source = screenshot_capture._inject_source(page)
+
+        # Varsayılan host listesi 'www.' öneki atılarak URL'den alınır
+        assert 'const hosts = ["example.com"];' in source
+        assert "document.readyState === 'loading'" in source
+        assert "addEventListener('DOMContentLoaded', runScripts" in source
+        assert re.search(r"const runScripts = \(\) => \{\s*try \{ calls\.push\(1\); \}", source)
+
+        page['inject']['hosts'] = ['example.org', 'example.net']
+        assert 'const hosts = ["example.org", "example.net"];' in screenshot_capture._inject_source(page)
+
+        # Stil veya betik yoksa boş kaynak döner
+        assert screenshot_capture._inject_source({'url': page['url'], 'inject': {'hosts': ['example.com']}}) == ''
+        assert screenshot_capture._inject_source({'url': page['url']}) == ''
+
+    @pytest.mark.skipif(shutil.which('node') is None, reason="node bulunamadı")
+    @pytest.mark.parametrize('hostname, ready_state, expected', [
+        ('www.example.com', 'loading', (0, 1)),
+        ('example.com', 'loading', (0, 1)),
+        ('shop.example.com', 'loading', (0, 1)),
+        ('www.example.com', 'complete', (1, 1)),
+        ('notexample.com', 'loading', (0, 0)),
+        ('tracker.net', 'complete', (0, 0)),
+    ])
+    def test_inject_source_execution(self, screenshot_capture, hostname, ready_state, expected):
+        """Enjeksiyon betiğinin alt alan adlarında çalıştığı, diğer host'larda çalışmadığı test"""
+        page = {'url': 'https://www.example.com/', 'inject': {'scripts': ['calls.push(1);']}}
+        source = screenshot_capture._inject_source(page)
+        assert run_inject_source(source, hostname, ready_state) == expected
+
+    def test_driver_path_from_config(self, screenshot_capture, tmp_path):
+        """Config'deki driver_path'in doğrudan kullanıldığı, yoksa hata verildiği test"""
+        driver_path = tmp_path / 'chromedriver'
+        driver_path.write_bytes(b'')
+        screenshot_capture.config['browser']['driver_path'] = str(driver_path)
+        assert screenshot_capture._resolve_driver_path() == str(driver_path)
+
+        screenshot_capture.config['browser']['driver_path'] = str(tmp_path / 'eksik')
+        with pytest.raises(FileNotFoundError):
+            screenshot_capture._resolve_driver_path()
+
+    def test_driver_cache(self, screenshot_capture, tmp_path, monkeypatch):
+        """chromedriver önbelleğinin Chrome sürümüne göre kullanıldığı ve yenilendiği test"""
+        cache_path = tmp_path / 'chromedriver.json'
+        cached_driver = tmp_path / 'cached-chromedriver'
+        cached_driver.write_bytes(b'')
+        installed_driver = str(tmp_path / 'installed-chromedriver')
+        screenshot_capture.config['browser'].update({'driver_path': None, 'driver_cache': str(cache_path)})
+
+        installs = []
+
+        class FakeManager:
+            def install(self):
+                installs.append(installed_driver)
+                return installed_driver
+
+        monkeypatch.setattr(webdriver_manager.chrome, 'ChromeDriverManager', FakeManager)
+        monkeypatch.setattr(screenshot_capture_module, 'detect_chrome_version', lambda binary=None: '120.0.1')
+
+        # Önbellek isabeti: indirme yapılmaz
+        cache_path.write_text(json.dumps({'120.0.1': str(cached_driver)}))
+        assert screenshot_capture._resolve_driver_path() == str(cached_driver)
+        assert installs == []
+
+        # Yenileme kaydı yok sayar ve üzerine yazar
+        assert screenshot_capture._resolve_driver_path(refresh=True) == installed_driver
+        assert json.loads(cache_path.read_text()) == {'120.0.1': installed_driver}
+
+        # Sürüm bilinmiyorsa önbellek ne okunur ne yazılır
+        monkeypatch.setattr(screenshot_capture_module, 'detect_chrome_version', lambda binary=None: None)
+        cache_path.write_text(json.dumps({'unknown': str(cached_driver)}))
+        assert screenshot_capture._resolve_driver_path() == installed_driver
+        assert json.loads(cache_path.read_text()) == {'unknown': str(cached_driver)}
+        assert len(installs) == 2
+
+    def test_wait_until_stable(self, screenshot_capture):
+        """Kareler oturduğunda beklemenin üst sınırdan önce bittiği test"""
+        screenshot_capture.stability_interval = 0.01
+        screenshot_capture.stability_frames = 3
+        moving = [np.full((32, 32, 3), value, dtype=np.uint8) for value in (0, 80, 160)]
+        settled = np.full((32, 32, 3), 255, dtype=np.uint8)
+        driver = FramesDriver(moving + [settled])
+
+        started = time.monotonic()
+        screenshot_capture._wait_until_stable(driver, timeout=5)
+
+        # 3 değişen kare + art arda eşleşen 3 kare
+        assert driver.shots == len(moving) + 3
+        assert time.monotonic() - started < 1
+
+    def test_wait_until_stable_timeout(self, screenshot_capture):
+        """Sürekli değişen sayfada beklemenin üst sınırda bittiği test"""
+        screenshot_capture.stability_interval = 0.01
+        frames = [np.full((32, 32, 3), value % 256, dtype=np.uint8) for value in range(0, 256 * 40, 64)]
+        driver = FramesDriver(frames)
+
+        started = time.monotonic()
+        screenshot_capture._wait_until_stable(driver, timeout=0.2)
+        elapsed = time.monotonic() - started
+
+        assert 0.2 <= elapsed < 1
+        assert driver.shots < len(frames)
+
+    def test_deterministic_waits(self, screenshot_capture):
+        """Deterministik modda kararlılığın ilk eşleşmede bittiği, ağ izlenemezse sabit beklemeye düşüldüğü test"""
+        screenshot_capture.deterministic = True
+        screenshot_capture.stability_interval = 0.01
+        screenshot_capture.stability_frames = 5
+        frozen = np.full((32, 32, 3), 255, dtype=np.uint8)
+        driver = FramesDriver([frozen])
+
+        screenshot_capture._wait_until_stable(driver, timeout=5)
+        assert driver.shots == 2
+
+        # 'fixed' atlanır; performans logu yoksa 'network-idle' üst sınıra kadar uyur
+        screenshot_capture.wait_strategies = ['fixed']
+        assert screenshot_capture._settle(driver, 0.2) < 0.1
+
+        class NoLogMonitor:
+            available = False
+
+        screenshot_capture.wait_strategies = ['network-idle']
+        assert screenshot_capture._settle(driver, 0.2, NoLogMonitor()) >= 0.2
+
+    def test_network_monitor(self):
+        """Devam eden, biten ve engellenen isteklerin sayıldığı test"""
+        now = time.time()
+        driver = LogDriver([
+            # Önceki sayfadan kalan olaylar oluşturulurken atılır
+            [network_event('Network.requestWillBeSent', 'eski', now - 10)],
+            [
+                network_event('Network.requestWillBeSent', '1', now - 5),
+                network_event('Network.requestWillBeSent', '2', now - 5),
+                network_event('Network.requestWillBeSent', '3', now - 4),
+                # Yönlendirme aynı istek kimliğiyle tekrar gelir, yeni istek sayılmaz
+                network_event('Network.requestWillBeSent', '1', now - 4),
+                network_event('Network.loadingFinished', '1', now - 3),
+                network_event('Network.loadingFailed', '3', now - 3, blockedReason='inspector'),
+                {'message': 'bozuk'}
+            ],
+            [network_event('Network.loadingFailed', '2', now + 60, errorText='net::ERR_FAILED')]
+        ])
+        monitor = NetworkMonitor(driver)
+        assert monitor.total_requests == 0
+
+        assert monitor.poll() == 1
+        assert monitor.total_requests == 3
+        assert monitor.blocked_requests == 1
+
+        assert monitor.poll() == 0
+        assert monitor.blocked_requests == 1
+        assert monitor.available is True
+        # Son etkinlik olayın tarayıcıdaki zamanıdır, okunma anı değil
+        assert monitor.last_activity == pytest.approx(now + 60)
+
+    def test_wait_network_idle(self, screenshot_capture):
+        """Ağ sessizleştiğinde beklemenin bittiği, log yoksa izleyicinin devre dışı kaldığı test"""
+        screenshot_capture.network_idle_ms = 100
+        screenshot_capture.network_poll_interval = 0.01
+        start = time.time()
+        driver = LogDriver([
+            [],
+            [network_event('Network.requestWillBeSent', '1', start)],
+            [network_event('Network.loadingFinished', '1', start)]
+        ])
+        monitor = NetworkMonitor(driver)
+
+        started = time.monotonic()
+        screenshot_capture._wait_network_idle(monitor, timeout=5)
+        elapsed = time.monotonic() - started
+        assert monitor.poll() == 0
+        assert 0.05 <= elapsed < 1
+
+        class NoLogDriver(FakeDriver):
+            def get_log(self, log_type):
+                raise RuntimeError('performans logu kapalı')
+
+        assert NetworkMonitor(NoLogDriver()).available is False
+
+    def test_capture_full_page(self, screenshot_capture, tmp_path):
+        """Kaydırılarak dikilen tam sayfanın kaynakla birebir aynı olduğu test"""
+        screenshot_capture.full_page_scroll_delay = 0
+        page = np.random.default_rng(3).integers(0, 256, size=(2500, 64, 3), dtype=np.uint8)
+        # 400 CSS piksel görünüm, DPR 2: 800 satırlık dilimler, son dilim 850'de sınırlanır
+        driver = ScrollingDriver(page, viewport_height=400, pixel_ratio=2)
+        screenshot_path = str(tmp_path / 'full.png')
+
+        height = screenshot_capture._capture_full_page(driver, screenshot_path, in_memory=False)
+
+        assert height == 2500
+        assert np.array_equal(cv2.imread(screenshot_path), page)
+        assert driver.scroll_y == 0
+
+    def test_capture_full_page_max_height(self, screenshot_capture, tmp_path):
+        """Tam sayfa yüksekliğinin full_page_max_height ile sınırlandığı test"""
+        screenshot_capture.full_page_scroll_delay = 0
+        screenshot_capture.full_page_max_height = 1000
+        page = np.random.default_rng(4).integers(0, 256, size=(2500, 64, 3), dtype=np.uint8)
+        driver = ScrollingDriver(page, viewport_height=400, pixel_ratio=2)
+        screenshot_path = str(tmp_path / 'full.png')
+
+        height = screenshot_capture._capture_full_page(driver, screenshot_path, in_memory=True)
+
+        assert height == 1000
+        stitched = cv2.imdecode(np.frombuffer(screenshot_capture.captured_images[screenshot_path], dtype=np.uint8), cv2.IMREAD_COLOR)
+        assert np.array_equal(stitched, page[:1000])
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
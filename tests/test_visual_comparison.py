@@ -6,24 +6,34 @@ Bu dosya, görsel karşılaştırma fonksiyonlarını test eder.
 
 import pytest
 import os
+import pickle
 import sys
 import cv2
 import numpy as np
-from PIL import Image
+from PIL import Image, ImageDraw
 
 # src klasörünü Python path'ine ekle
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'config', 'test_config.json')
 
+import image_comparison as image_comparison_module
 from image_comparison import ImageComparison
+from result_cache import ResultCache, atomic_write
+from baseline_store import BaselineStore
 
 
 class TestImageComparison:
     """Görsel karşılaştırma testleri"""
     
     @pytest.fixture
-    def image_comparison(self):
-        """ImageComparison örneği oluşturur"""
-        return ImageComparison()
+    def image_comparison(self, tmp_path, monkeypatch):
+        """ImageComparison örneği oluşturur
+
+        Fark görüntüleri (results/) ve önbellek (.cache/) depoya değil
+        geçici klasöre yazılsın diye çalışma dizini tmp_path'e alınır.
+        """
+        monkeypatch.chdir(tmp_path)
+        return ImageComparison(CONFIG_FILE)
     
     @pytest.fixture
     def test_images_dir(self):
@@ -37,6 +47,15 @@ class TestImageComparison:
         image.save(path)
         return path
     
+    def create_page_images(self, tmp_path, names, size=(100, 100), test_color=(255, 255, 255)):
+        """Her ad için beyaz referans ve test_color renginde test görüntüsü oluşturur"""
+        baseline_dir = str(tmp_path / 'baseline')
+        screenshots_dir = str(tmp_path / 'screenshots')
+        for name in names:
+            self.create_test_image(os.path.join(baseline_dir, f'{name}.png'), size=size)
+            self.create_test_image(os.path.join(screenshots_dir, f'{name}.png'), size=size, color=test_color)
+        return baseline_dir, screenshots_dir
+    
     def test_load_image_success(self, image_comparison, test_images_dir):
         """Görüntü yükleme başarı testi"""
         # Test görüntüsü oluştur
@@ -133,7 +152,11 @@ class TestImageComparison:
         image2_path = os.path.join(test_images_dir, 'image2.png')
         
         self.create_test_image(image1_path, color=(255, 255, 255))
-        self.create_test_image(image2_path, color=(200, 200, 200))  # Biraz farklı
+        self.create_test_image(image2_path, color=(255, 255, 255))
+        # Görüntünün %40'ını kaplayan siyah şerit: benzerlik 0.6 (0.5 ile 0.99 arasında)
+        image = Image.open(image2_path)
+        ImageDraw.Draw(image).rectangle([0, 0, 99, 39], fill=(0, 0, 0))
+        image.save(image2_path)
         
         # Yüksek eşik ile test
         image_comparison.threshold = 0.99
@@ -144,12 +167,391 @@ class TestImageComparison:
         result_low = image_comparison.compare_images(image1_path, image2_path, 'test_page')
         
         # Sonuçları kontrol et
-        assert result_high['passed'] != result_low['passed']
+        assert result_high['similarity_score'] == pytest.approx(0.6)
+        assert result_high['passed'] is False
+        assert result_low['passed'] is True
         
         # Temizlik
         os.remove(image1_path)
         os.remove(image2_path)
 
+    def test_compare_all_pages_parallel(self, image_comparison, tmp_path):
+        """Paralel karşılaştırma sırası ve bozuk dosya izolasyonu testi"""
+        page_names = [page['name'] for page in image_comparison.config['test_pages']]
+        baseline_dir, screenshots_dir = self.create_page_images(tmp_path, page_names)
+        
+        # İlk sayfanın test görüntüsünü boz
+        with open(os.path.join(screenshots_dir, f'{page_names[0]}.png'), 'wb') as f:
+            f.write(b'bozuk png')
+        
+        image_comparison.result_cache = None
+        sequential = image_comparison.compare_all_pages(baseline_dir, screenshots_dir, workers=1)
+        parallel = image_comparison.compare_all_pages(baseline_dir, screenshots_dir, workers=2)
+        
+        # Sonuçları kontrol et
+        assert [r['page_name'] for r in parallel['results']] == page_names
+        assert [r['success'] for r in parallel['results']] == [r['success'] for r in sequential['results']]
+        assert parallel['results'][0]['success'] is False
+        assert parallel['total_tests'] == sequential['total_tests'] == len(page_names) - 1
+        assert parallel['passed_tests'] == sequential['passed_tests']
+
+    def test_worker_state(self, image_comparison, tmp_path):
+        """İşçiye giden örneğin plan, önbellek ve bellekteki görüntüleri taşımadığı test"""
+        image_comparison.result_cache = ResultCache(str(tmp_path / 'cache'))
+        image_comparison.compile_plan()
+        image_comparison.add_test_image('screenshots/sayfa.png', b'png')
+        
+        worker_copy = pickle.loads(pickle.dumps(image_comparison))
+        
+        # Sonuçları kontrol et
+        assert image_comparison._plan
+        assert worker_copy._plan == {}
+        assert worker_copy.result_cache is None
+        assert worker_copy._test_images == {}
+        
+        # İşçi plan kaydını işle birlikte alır ve iş bitince atar
+        image_comparison_module._init_worker(worker_copy)
+        baseline_path = self.create_test_image(str(tmp_path / 'baseline.png'))
+        test_path = self.create_test_image(str(tmp_path / 'test.png'), color=(0, 0, 0))
+        plan_entry = image_comparison._plan_entry('google_homepage')
+        result = image_comparison_module._compare_page_job(baseline_path, test_path, 'google_homepage', plan_entry)
+        assert result['passed'] is False
+        assert worker_copy._plan == {}
+
+    def test_compare_all_pages_ready_pages(self, image_comparison, tmp_path):
+        """Hazır gelen sayfalarla karşılaştırmanın sıralı modla aynı özeti verdiği test"""
+        page_names = [page['name'] for page in image_comparison.config['test_pages']]
+        baseline_dir, screenshots_dir = self.create_page_images(tmp_path, page_names, test_color=(0, 0, 0))
+        
+        image_comparison.result_cache = None
+        sequential = image_comparison.compare_all_pages(baseline_dir, screenshots_dir)
+        
+        # Sayfalar ters sırada hazır olur, biri hiç gelmez (diskteki dosya kullanılır)
+        ready_pages = iter(list(reversed(page_names))[:-1] + ['bilinmeyen_sayfa'])
+        pipelined = image_comparison.compare_all_pages(baseline_dir, screenshots_dir, ready_pages=ready_pages)
+        
+        # Sonuçları kontrol et
+        assert [r['page_name'] for r in pipelined['results']] == page_names
+        assert [r['different_pixels'] for r in pipelined['results']] == [r['different_pixels'] for r in sequential['results']]
+        assert pipelined['passed_tests'] == sequential['passed_tests']
+        assert pipelined['total_tests'] == sequential['total_tests']
+
+    def test_compare_all_pages_cache(self, image_comparison, tmp_path):
+        """Sonuç önbelleği isabet ve geçersizleştirme testi"""
+        image_comparison.result_cache = ResultCache(str(tmp_path / 'cache'))
+        
+        page_names = [page['name'] for page in image_comparison.config['test_pages']]
+        baseline_dir, screenshots_dir = self.create_page_images(tmp_path, page_names)
+        
+        first = image_comparison.compare_all_pages(baseline_dir, screenshots_dir)
+        
+        # Bir sayfanın test görüntüsünü değiştir
+        self.create_test_image(os.path.join(screenshots_dir, f'{page_names[0]}.png'), color=(0, 0, 0))
+        second = image_comparison.compare_all_pages(baseline_dir, screenshots_dir)
+        
+        # Sonuçları kontrol et
+        assert not any(r.get('cached') for r in first['results'])
+        assert [r.get('cached', False) for r in second['results']] == [False] + [True] * (len(page_names) - 1)
+        assert second['results'][0]['passed'] is False
+        assert [r['page_name'] for r in second['results']] == page_names
+
+    def test_identical_files_fast_path(self, image_comparison, tmp_path):
+        """Birebir aynı dosyalarda görüntü çözmeden PASS testi"""
+        image1_path = self.create_test_image(str(tmp_path / 'image1.png'), size=(120, 80))
+        image2_path = self.create_test_image(str(tmp_path / 'image2.png'), size=(120, 80))
+        
+        image_comparison.write_identical_diffs = False
+        result = image_comparison.compare_images(image1_path, image2_path, 'test_page')
+        
+        # Sonuçları kontrol et
+        assert result['identical_files'] is True
+        assert result['passed'] is True
+        assert result['different_pixels'] == 0
+        assert result['total_pixels'] == 120 * 80
+        assert 'difference_image_path' not in result
+        
+        # Fark görüntüsü istenirse yine de yazılır
+        image_comparison.write_identical_diffs = True
+        result = image_comparison.compare_images(image1_path, image2_path, 'test_page')
+        assert os.path.exists(result['difference_image_path'])
+
+    def test_identical_files_digested_once(self, image_comparison, tmp_path, monkeypatch):
+        """Önbellek anahtarı ve hızlı yolun aynı içerik özetlerini paylaştığı test"""
+        image_comparison.result_cache = ResultCache(str(tmp_path / 'cache'))
+        page_names = [page['name'] for page in image_comparison.config['test_pages']]
+        baseline_dir, screenshots_dir = self.create_page_images(tmp_path, page_names)
+        
+        digested = []
+        original_digest = image_comparison_module.file_digest
+        
+        def counting_digest(path, *args):
+            digested.append(path)
+            return original_digest(path, *args)
+        
+        monkeypatch.setattr(image_comparison_module, 'file_digest', counting_digest)
+        summary = image_comparison.compare_all_pages(baseline_dir, screenshots_dir, workers=1)
+        
+        # Sonuçları kontrol et
+        assert all(result['identical_files'] for result in summary['results'])
+        assert sorted(digested) == sorted(set(digested))
+        assert len(digested) == 2 * len(page_names)
+
+    def test_tiled_comparison_matches_full(self, image_comparison, tmp_path):
+        """Şeritli karşılaştırmanın tam kare ile aynı sonucu verdiği test"""
+        rng = np.random.default_rng(42)
+        baseline = rng.integers(0, 256, size=(300, 64, 3), dtype=np.uint8)
+        test = baseline.copy()
+        # Şerit sınırlarına denk gelen farklar ekle
+        test[45:60, 10:30] = 0
+        test[98:103, 5:50] = 255
+        test[200:260, 40:60] = 128
+        
+        image1_path = str(tmp_path / 'image1.png')
+        image2_path = str(tmp_path / 'image2.png')
+        cv2.imwrite(image1_path, baseline)
+        cv2.imwrite(image2_path, test)
+        
+        image_comparison.tiling_mode = 'never'
+        full = image_comparison.compare_images(image1_path, image2_path, 'test_page')
+        
+        image_comparison.tiling_mode = 'always'
+        image_comparison.tile_height = 50
+        tiled = image_comparison.compare_images(image1_path, image2_path, 'test_page')
+        
+        # Sonuçları kontrol et
+        assert tiled['tiles'] == 6
+        assert tiled['different_pixels'] == full['different_pixels']
+        assert tiled['passed'] == full['passed']
+        assert os.path.exists(tiled['difference_image_path'])
+        assert cv2.imread(tiled['difference_image_path']).shape == (300, 64 * 4, 3)
+
+    def test_pyramid_early_decision(self, image_comparison, tmp_path):
+        """Piramit modunda net sonuçların kaba seviyede verildiği test"""
+        image1_path = str(tmp_path / 'image1.png')
+        image2_path = str(tmp_path / 'image2.png')
+        image3_path = str(tmp_path / 'image3.png')
+        
+        self.create_test_image(image1_path, size=(200, 200), color=(255, 255, 255))
+        self.create_test_image(image2_path, size=(200, 200), color=(0, 0, 0))
+        self.create_test_image(image3_path, size=(200, 200), color=(254, 254, 254))
+        
+        image_comparison.pyramid_enabled = True
+        image_comparison.pyramid_levels = 2
+        failed = image_comparison.compare_images(image1_path, image2_path, 'test_page')
+        passed = image_comparison.compare_images(image1_path, image3_path, 'test_page')
+        
+        # Sonuçları kontrol et
+        assert failed['passed'] is False
+        assert failed['decision_level'] == 2
+        assert passed['passed'] is True
+        assert passed['decision_level'] == 2
+
+    def test_diff_regions(self, image_comparison, tmp_path):
+        """Fark bölgelerinin tam ve şeritli modda aynı bulunduğu test"""
+        baseline = np.full((300, 200, 3), 255, dtype=np.uint8)
+        test = baseline.copy()
+        test[40:70, 20:60] = 0       # 30x40 = 1200 piksel, şerit sınırını (50) keser
+        test[200:210, 150:160] = 0   # 10x10 = 100 piksel
+        
+        image1_path = str(tmp_path / 'image1.png')
+        image2_path = str(tmp_path / 'image2.png')
+        cv2.imwrite(image1_path, baseline)
+        cv2.imwrite(image2_path, test)
+        
+        image_comparison.diff_artifact = 'regions'
+        image_comparison.tiling_mode = 'never'
+        full = image_comparison.compare_images(image1_path, image2_path, 'test_page')
+        
+        image_comparison.tiling_mode = 'always'
+        image_comparison.tile_height = 50
+        tiled = image_comparison.compare_images(image1_path, image2_path, 'test_page')
+        
+        # Sonuçları kontrol et
+        expected = [
+            {'x': 20, 'y': 40, 'width': 40, 'height': 30, 'area': 1200},
+            {'x': 150, 'y': 200, 'width': 10, 'height': 10, 'area': 100}
+        ]
+        assert full['diff_regions'] == expected
+        assert tiled['diff_regions'] == expected
+        assert full['diff_region_count'] == 2
+        assert 'difference_image_path' not in full
+        assert len(full['region_image_paths']) == 2
+        
+        # Kırpılmış görüntü: 4 panel x (bölge + 2 x kenar boşluğu)
+        thumbnail = cv2.imread(full['region_image_paths'][1])
+        assert thumbnail.shape == (10 + 32, (10 + 32) * 4, 3)
+
+    def test_async_artifact_writer(self, image_comparison, tmp_path):
+        """Arka planda yazılan fark görüntülerinin dönüşte diskte olduğu test"""
+        image_comparison.result_cache = None
+        image_comparison.async_writer_enabled = True
+        image_comparison.diff_format = 'webp'
+        
+        page_names = [page['name'] for page in image_comparison.config['test_pages']]
+        baseline_dir, screenshots_dir = self.create_page_images(tmp_path, page_names, test_color=(0, 0, 0))
+        
+        summary = image_comparison.compare_all_pages(baseline_dir, screenshots_dir, workers=1)
+        
+        # Sonuçları kontrol et
+        assert image_comparison._artifact_writer is None
+        for result in summary['results']:
+            assert result['difference_image_path'].endswith('.webp')
+            assert cv2.imread(result['difference_image_path']).shape == (100, 400, 3)
+
+    def test_async_artifact_write_failure(self, image_comparison, tmp_path, monkeypatch):
+        """Arka planda yazılamayan fark görüntüsünün sonuçtan çıkarıldığı test"""
+        image_comparison.result_cache = ResultCache(str(tmp_path / 'cache'))
+        image_comparison.async_writer_enabled = True
+        page_names = [page['name'] for page in image_comparison.config['test_pages']]
+        baseline_dir, screenshots_dir = self.create_page_images(tmp_path, page_names, test_color=(0, 0, 0))
+        
+        with monkeypatch.context() as patch:
+            patch.setattr(cv2, 'imwrite', lambda path, image, params=None: False)
+            summary = image_comparison.compare_all_pages(baseline_dir, screenshots_dir, workers=1)
+        
+        # Sonuçları kontrol et
+        assert all(result['success'] for result in summary['results'])
+        assert not any('difference_image_path' in result for result in summary['results'])
+        
+        # Önbelleğe alınan sonuç da fark görüntüsünü yeniden üretmek ister
+        second = image_comparison.compare_all_pages(baseline_dir, screenshots_dir, workers=1)
+        assert not any(result.get('cached') for result in second['results'])
+        assert all(os.path.exists(result['difference_image_path']) for result in second['results'])
+
+    def test_compile_plan(self, image_comparison):
+        """Karşılaştırma planının sayfa ayarlarını bir kez çözdüğü test"""
+        plan = image_comparison.compile_plan('baseline_dir', 'screenshots_dir')
+        
+        # Sonuçları kontrol et
+        page_names = [page['name'] for page in image_comparison.config['test_pages']]
+        assert list(plan) == page_names
+        
+        google = plan['google_homepage']
+        assert google['settings']['tolerance'] == 15
+        assert google['settings']['special'] is True
+        assert google['baseline_path'] == os.path.join('baseline_dir', 'google_homepage.png')
+        assert google['kernel'].shape == (3, 3)
+        
+        github = plan['github_homepage']
+        assert github['settings']['tolerance'] == image_comparison.tolerance
+        assert github['settings']['special'] is False
+        
+        # Config'de olmayan sayfa genel ayarlarla çözülür
+        assert image_comparison._plan_entry('unknown_page')['settings']['threshold'] == image_comparison.threshold
+
+    def test_element_scope(self, image_comparison, tmp_path):
+        """Öğe kapsamında her öğenin ayrı karşılaştırıldığı test"""
+        image_comparison.config['capture_settings'] = {'scope': 'elements'}
+        image_comparison.result_cache = None
+        
+        page_config = image_comparison.config['test_pages'][1]
+        element_names = [name for name in page_config['elements'] if page_config['element_selectors'].get(name)]
+        entry_names = [f"{page_config['name']}__{element_name}" for element_name in element_names]
+        baseline_dir, screenshots_dir = self.create_page_images(tmp_path, entry_names, size=(60, 20))
+        
+        # İlk öğe değişti, diğerleri aynı
+        self.create_test_image(os.path.join(screenshots_dir, f'{entry_names[0]}.png'), size=(60, 20), color=(0, 0, 0))
+        
+        summary = image_comparison.compare_all_pages(baseline_dir, screenshots_dir)
+        
+        # Sonuçları kontrol et
+        assert page_config['name'] not in image_comparison._plan
+        assert [r['element'] for r in summary['results']] == element_names
+        assert all(r['parent_page'] == page_config['name'] for r in summary['results'])
+        assert [r['passed'] for r in summary['results']] == [False] + [True] * (len(element_names) - 1)
+
+    def test_ssim_scoring(self, image_comparison, tmp_path):
+        """SSIM skorunun tam ve şeritli modda aynı hesaplandığı test"""
+        rng = np.random.default_rng(7)
+        baseline = rng.integers(0, 256, size=(240, 80, 3), dtype=np.uint8)
+        test = baseline.copy()
+        test[100:140, 10:50] = 0
+        
+        image1_path = str(tmp_path / 'image1.png')
+        image2_path = str(tmp_path / 'image2.png')
+        cv2.imwrite(image1_path, baseline)
+        cv2.imwrite(image2_path, test)
+        
+        image_comparison.scoring = 'ssim'
+        image_comparison.tiling_mode = 'never'
+        full = image_comparison.compare_images(image1_path, image2_path, 'test_page')
+        
+        image_comparison.tiling_mode = 'always'
+        image_comparison.tile_height = 64
+        tiled = image_comparison.compare_images(image1_path, image2_path, 'test_page')
+        
+        # Sonuçları kontrol et
+        assert full['scoring'] == 'ssim'
+        assert 0.0 < full['ssim_score'] < 1.0
+        assert 'similarity_score' in full
+        assert tiled['ssim_score'] == pytest.approx(full['ssim_score'], abs=1e-6)
+
+    def test_baseline_store(self, image_comparison, tmp_path):
+        """Referans düzlem deposunun memmap ile açıldığı ve geçersizleştiği test"""
+        baseline_path = str(tmp_path / 'baseline.png')
+        test_path = str(tmp_path / 'test.png')
+        self.create_test_image(baseline_path, color=(255, 255, 255))
+        self.create_test_image(test_path, color=(0, 0, 0))
+        
+        image_comparison.baseline_store = BaselineStore()
+        first = image_comparison.compare_images(baseline_path, test_path, 'test_page')
+        second = image_comparison.compare_images(baseline_path, test_path, 'test_page')
+        
+        # İkinci çalışma düzlemleri diskten memmap ile açar
+        color, gray = image_comparison.baseline_store.load(baseline_path)
+        assert isinstance(color, np.memmap) and isinstance(gray, np.memmap)
+        assert gray.shape == (100, 100)
+        assert image_comparison.baseline_store.misses == 1
+        assert first['different_pixels'] == second['different_pixels']
+        
+        # Referans değişince depo yenilenir
+        self.create_test_image(baseline_path, color=(2, 2, 2))
+        os.utime(baseline_path, ns=(0, 0))
+        third = image_comparison.compare_images(baseline_path, test_path, 'test_page')
+        assert image_comparison.baseline_store.misses == 2
+        assert third['different_pixels'] == 0
+    
+    def test_atomic_write(self, tmp_path):
+        """Atomik yazımın yarım dosya ve geçici dosya bırakmadığı test"""
+        path = str(tmp_path / 'index.json')
+        atomic_write(path, '{"a": 1}')
+        
+        def failing_writer(f):
+            f.write(b'yarim')
+            raise OSError("disk dolu")
+        
+        with pytest.raises(OSError):
+            atomic_write(path, failing_writer)
+        
+        # Eski içerik korunur, geçici dosya kalmaz
+        with open(path, 'rb') as f:
+            assert f.read() == b'{"a": 1}'
+        assert os.listdir(tmp_path) == ['index.json']
+    
+    def test_in_memory_test_images(self, image_comparison, tmp_path):
+        """Test görüntüsünün diske yazılmadan bellekten karşılaştırıldığı test"""
+        baseline_path = str(tmp_path / 'baseline.png')
+        test_path = str(tmp_path / 'test.png')
+        self.create_test_image(baseline_path, color=(255, 255, 255))
+        self.create_test_image(test_path, color=(0, 0, 0))
+        with open(test_path, 'rb') as f:
+            png_bytes = f.read()
+        os.remove(test_path)
+        
+        image_comparison.set_test_images({test_path: png_bytes})
+        result = image_comparison.compare_images(baseline_path, test_path, 'test_page')
+        
+        # Sonuçları kontrol et
+        assert result['success'] is True
+        assert result['different_pixels'] == 100 * 100
+        assert not os.path.exists(test_path)
+        
+        # Aynı baytlar hızlı yoldan geçer
+        with open(baseline_path, 'rb') as f:
+            image_comparison.set_test_images({test_path: f.read()})
+        result = image_comparison.compare_images(baseline_path, test_path, 'test_page')
+        assert result['identical_files'] is True
+
 
 if __name__ == "__main__":
     pytest.main([__file__]) 
\ No newline at end of file